@@ -1,5 +1,10 @@
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+import hashlib
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import os
@@ -11,6 +16,10 @@ load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-keep-it-secret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+# A rotated refresh token presented again within this window is taken as a concurrent refresh
+# (e.g. two tabs sharing one token) rather than a replay of a leaked token
+REFRESH_TOKEN_REUSE_GRACE_SECONDS = float(os.getenv("REFRESH_TOKEN_REUSE_GRACE_SECONDS", "30"))
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -20,6 +29,63 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# bcrypt is CPU-bound, so it runs on a small dedicated pool instead of the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_pending = 0
+_password_metrics = {
+    "completed": 0,
+    "rejected": 0,
+    "peak_pending": 0,
+    "queue_wait_seconds": 0.0,
+    "hash_seconds": 0.0,
+}
+
+class PasswordHasherBusy(Exception):
+    """Raised when the bcrypt queue is full; callers should answer 503."""
+
+def _timed_call(func: Callable, args: tuple, submitted_at: float):
+    started_at = time.perf_counter()
+    result = func(*args)
+    return result, started_at - submitted_at, time.perf_counter() - started_at
+
+async def _run_password_job(func: Callable, *args):
+    global _password_pending
+    if _password_pending >= PASSWORD_HASH_MAX_PENDING:
+        _password_metrics["rejected"] += 1
+        raise PasswordHasherBusy("Too many password operations in progress")
+
+    _password_pending += 1
+    _password_metrics["peak_pending"] = max(_password_metrics["peak_pending"], _password_pending)
+    try:
+        loop = asyncio.get_running_loop()
+        result, waited, worked = await loop.run_in_executor(
+            _password_executor, _timed_call, func, args, time.perf_counter()
+        )
+    finally:
+        _password_pending -= 1
+
+    _password_metrics["completed"] += 1
+    _password_metrics["queue_wait_seconds"] += waited
+    _password_metrics["hash_seconds"] += worked
+    return result
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    return await _run_password_job(get_password_hash, password)
+
+def password_hash_stats() -> Dict[str, Any]:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "pending": _password_pending,
+        **_password_metrics,
+    }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -29,3 +95,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+def hash_refresh_token(token: str) -> str:
+    # Refresh tokens are high-entropy random strings, so a fast digest is enough (no bcrypt)
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def create_refresh_token() -> Tuple[str, str, datetime]:
+    """Return a new refresh token, the digest to store for it, and its expiry."""
+    token = secrets.token_urlsafe(32)
+    expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    return token, hash_refresh_token(token), expires_at
@@ -0,0 +1,25 @@
+import argparse
+import asyncio
+import sys
+import os
+from datetime import date
+
+# Add the parent directory to sys.path to allow imports from backend
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import engine
+from backend.services import attempt_rollups
+
+async def main(since, until):
+    try:
+        days = await attempt_rollups.backfill(engine, since, until)
+        print(f"Rebuilt daily rollups for {days} day(s).")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild attempt_daily_rollups from quiz_attempts.")
+    parser.add_argument("--since", type=date.fromisoformat, help="first UTC day to rebuild (default: first attempt)")
+    parser.add_argument("--until", type=date.fromisoformat, help="UTC day to stop before (default: after the last attempt)")
+    args = parser.parse_args()
+    asyncio.run(main(args.since, args.until))
@@ -0,0 +1,97 @@
+"""
+Compare the ORM + response_model path with the Core + orjson path for list endpoints.
+
+Inserts synthetic users and quiz attempts inside a transaction that is rolled
+back at the end, so it can run against any database without leaving rows behind.
+
+Usage: python -m backend.bench_serialization [--rows 20000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, schemas, fast_json
+from .database import engine
+
+
+async def _seed(session: AsyncSession, rows: int) -> None:
+    user_ids = [uuid.uuid4() for _ in range(rows)]
+    await session.execute(insert(models.User), [
+        {"id": user_id, "email": f"bench-{user_id}@example.com", "hashed_password": "x", "is_active": True}
+        for user_id in user_ids
+    ])
+    await session.execute(insert(models.QuizAttempt), [
+        {
+            "user_id": user_id,
+            "recommended_domain": models.QuizDomain.programmer,
+            "programmer_score": 5,
+            "analytics_score": 3,
+            "tester_score": 2,
+            "total_score": 10,
+        }
+        for user_id in user_ids
+    ])
+
+
+async def _orm_path(session: AsyncSession, model, schema) -> bytes:
+    # What a response_model endpoint does: hydrate ORM objects, validate, then encode
+    objects = (await session.execute(select(model))).scalars().all()
+    adapter = TypeAdapter(List[schema])
+    body = adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+    session.expunge_all()
+    return body
+
+
+async def _fast_path(session: AsyncSession, model, schema) -> bytes:
+    response = await fast_json.rows_response(session, select(*fast_json.schema_columns(model, schema)))
+    return response.body
+
+
+async def _best_of(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+async def main(rows: int, repeat: int) -> None:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            session = AsyncSession(bind=conn, autoflush=False)
+            await _seed(session, rows)
+
+            for label, model, schema in [
+                ("users", models.User, schemas.User),
+                ("quiz_attempts", models.QuizAttempt, schemas.QuizAttempt),
+            ]:
+                orm_body = await _orm_path(session, model, schema)
+                fast_body = await _fast_path(session, model, schema)
+                assert orm_body == fast_body, f"{label}: response bodies differ"
+
+                orm = await _best_of(repeat, lambda: _orm_path(session, model, schema))
+                fast = await _best_of(repeat, lambda: _fast_path(session, model, schema))
+                total = (await session.execute(select(func.count()).select_from(model))).scalar_one()
+                print(
+                    f"{label:<14} rows={total:>7}  orm+pydantic={orm * 1000:8.1f} ms  "
+                    f"core+orjson={fast * 1000:8.1f} ms  speedup={orm / fast:4.1f}x"
+                )
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="synthetic rows per table")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path; the fastest one counts")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
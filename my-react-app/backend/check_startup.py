@@ -0,0 +1,58 @@
+"""
+Import-time budget check for the API process.
+
+Imports the app in a fresh interpreter a few times and fails when the best run
+exceeds the budget, or when a module that should load lazily is already imported.
+
+Usage: python -m backend.check_startup [--budget SECONDS] [--runs N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Heavy SDKs that must only be imported by the requests that use them
+LAZY_MODULES = ["google.generativeai"]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def measure() -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE % (LAZY_MODULES,)],
+        cwd=root, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=float, default=2.0, help="maximum import time in seconds")
+    parser.add_argument("--runs", type=int, default=3, help="imports to time; the fastest one counts")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(max(1, args.runs))]
+    best = min(run["seconds"] for run in runs)
+    loaded = sorted({module for run in runs for module in run["loaded"]})
+
+    print(f"import backend.main: {best:.3f}s (budget {args.budget:.3f}s, best of {len(runs)})")
+    failed = False
+    if best > args.budget:
+        print("FAIL: import time is over budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: modules imported eagerly: {', '.join(loaded)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import bisect
+import logging
+import os
+import random
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger("backend.sql")
+
+# Statements slower than this are always logged; the rest are logged at the sample rate
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+DB_QUERY_LOG_SAMPLE_RATE = float(os.getenv("DB_QUERY_LOG_SAMPLE_RATE", "0"))
+# Distinct normalized statements tracked before the rest are lumped together
+DB_QUERY_STATS_MAX_STATEMENTS = int(os.getenv("DB_QUERY_STATS_MAX_STATEMENTS", "500"))
+
+
+class PoolMetrics:
+    """Checkout counters for one engine's connection pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, waited: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that measures how long each checkout waited for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.record_wait(time.perf_counter() - started_at)
+        return connection
+
+    def recreate(self):
+        # Keep counters across engine.dispose()
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            in_use=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(
+            checkouts=metrics.checkouts,
+            timeouts=metrics.timeouts,
+            wait_seconds_total=metrics.wait_seconds_total,
+            wait_seconds_max=metrics.wait_seconds_max,
+            wait_seconds_avg=metrics.wait_seconds_total / metrics.checkouts if metrics.checkouts else 0.0,
+        )
+    return stats
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|(?<![:\w]):\w+\b")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:::[\w\[\]]+)?(?:\s*,\s*\?(?:::[\w\[\]]+)?)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """Collapse a statement to its shape so executions with different values share a key."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _VALUE_LIST.sub("(?)", sql)
+    sql = _REPEATED_LISTS.sub("(?), ...", sql)
+    return sql
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["gt_5000ms"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class QueryStats:
+    """Per-statement latency histograms keyed by normalized SQL."""
+
+    OTHER = "<other statements>"
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.slow_statements = 0
+
+    def observe(self, statement: str, elapsed_ms: float) -> None:
+        key = normalize_sql(statement)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            if len(self.histograms) >= DB_QUERY_STATS_MAX_STATEMENTS:
+                key = self.OTHER
+            histogram = self.histograms.setdefault(key, LatencyHistogram())
+        histogram.observe(elapsed_ms)
+
+        if elapsed_ms >= DB_SLOW_QUERY_MS:
+            self.slow_statements += 1
+            logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {key}")
+        elif DB_QUERY_LOG_SAMPLE_RATE and random.random() < DB_QUERY_LOG_SAMPLE_RATE:
+            logger.info(f"Query ({elapsed_ms:.1f} ms): {key}")
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        ranked = sorted(self.histograms.items(), key=lambda item: item[1].total_ms, reverse=True)
+        return [{"statement": key, **histogram.as_dict()} for key, histogram in ranked[:limit]]
+
+
+query_stats = QueryStats()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement the engine runs and feed it into `query_stats`."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started_at"].pop()
+        query_stats.observe(statement, (time.perf_counter() - started) * 1000)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _drop_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
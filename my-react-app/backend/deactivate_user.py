@@ -0,0 +1,57 @@
+import asyncio
+import os
+import sys
+import argparse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select
+from dotenv import load_dotenv
+
+# Add parent directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models import User
+from backend.principals import deactivate_user
+from backend.database import make_engine, normalize_database_url
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+if DATABASE_URL:
+    DATABASE_URL = normalize_database_url(DATABASE_URL)
+
+# Fix for Render: Append ?ssl=require if not already present and not localhost
+if DATABASE_URL and "localhost" not in DATABASE_URL and "?ssl=" not in DATABASE_URL:
+    DATABASE_URL += "?ssl=require"
+
+async def deactivate(email: str):
+    if not DATABASE_URL:
+        print("Error: DATABASE_URL is not set.")
+        return
+
+    engine = make_engine(DATABASE_URL)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with async_session() as session:
+        result = await session.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
+
+        if not user:
+            print(f"Error: User with email '{email}' not found.")
+        elif not user.is_active:
+            print(f"User '{email}' is already inactive.")
+        else:
+            # Always deactivate through deactivate_user: token claims are trusted
+            # to be active until the user's token version changes
+            await deactivate_user(session, user.id, email)
+            await session.commit()
+            print(f"'{email}' is now inactive and signed out everywhere.")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deactivate a user and revoke their tokens.")
+    parser.add_argument("email", type=str, help="The email address of the user to deactivate")
+    args = parser.parse_args()
+
+    asyncio.run(deactivate(args.email))
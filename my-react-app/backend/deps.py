@@ -3,21 +3,48 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
-from .database import SessionLocal
-from . import models, schemas, auth
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+import os
+from .database import ReadSessionLocal, engine, read_engine, get_db, request_session
+from .cache import TTLCache
+from . import schemas, auth
+from . import principals
+from .principals import Principal, load_principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
-async def get_db() -> Generator:
-    async with SessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+# How long a user's reads stay on the primary after they write; should exceed replica lag
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+recent_writers = TTLCache(maxsize=100000, ttl=READ_YOUR_WRITES_SECONDS)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> models.User:
+def mark_recent_write(subject: str) -> None:
+    """Route this user's replica reads to the primary until the replica has caught up."""
+    if read_engine is not engine:
+        recent_writers.set(subject, True)
+
+def _token_subject(token: Optional[str]) -> Optional[str]:
+    if not token:
+        return None
+    try:
+        return jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+async def get_read_db(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Generator:
+    """
+    Session for read-only endpoints: the replica, unless the caller wrote recently.
+    Without a replica this is the request's primary session, so auth and the handler share it.
+    """
+    if read_engine is engine or _token_subject(token) in recent_writers:
+        yield db
+        return
+    async with request_session(ReadSessionLocal) as session:
+        yield session
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -32,26 +59,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     except JWTError:
         raise credentials_exception
     
-    result = await db.execute(select(models.User).options(selectinload(models.User.roles)).where(models.User.email == token_data.email))
-    user = result.scalars().first()
+    claimed = principals.principal_from_claims(payload)
+    if claimed is not None:
+        # Tokens issued before a revocation carry an older version
+        if payload.get("ver", 0) < await principals.token_versions.get(db, claimed.id):
+            raise credentials_exception
+        if principals.AUTH_TRUST_TOKEN_CLAIMS:
+            return claimed
+    
+    # Cached per token subject; see principals.py for invalidation
+    principal = await load_principal(db, token_data.email)
     
-    if user is None:
+    if principal is None:
         raise credentials_exception
-    return user
+    return principal
 
-async def get_current_active_user(current_user: models.User = Depends(get_current_user)) -> models.User:
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-async def get_current_admin_user(current_user: models.User = Depends(get_current_active_user)) -> models.User:
-    is_admin = False
-    for user_role in current_user.roles:
-        if user_role.role == models.AppRole.admin:
-            is_admin = True
-            break
-    
-    if not is_admin:
+async def get_current_admin_user(current_user: Principal = Depends(get_current_active_user)) -> Principal:
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges"
@@ -0,0 +1,47 @@
+from typing import Any, List, Type
+from uuid import UUID
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Match Pydantic's JSON output: UTC datetimes end in "Z"
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    # asyncpg returns its own UUID subclass, which orjson only handles via this hook
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode with orjson; enums, UUIDs and datetimes come out as Pydantic would write them."""
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> List[Any]:
+    """The model's columns for each schema field, in the schema's field order."""
+    return [getattr(model, name).label(name) for name in schema.model_fields]
+
+
+async def rows_response(db: AsyncSession, statement: Select) -> FastJSONResponse:
+    """
+    Run a Core select and serialize the rows straight to JSON, skipping ORM
+    hydration and response_model validation. Select only columns the response
+    schema declares (see `schema_columns`) so the shape stays the same.
+    """
+    result = await db.execute(statement)
+    keys = list(result.keys())
+    return FastJSONResponse([dict(zip(keys, row)) for row in result.all()])
@@ -5,17 +5,16 @@ import os
 # Add the parent directory to sys.path to allow imports from backend
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.database import engine, Base
-from backend import models
+from backend.database import engine
+from backend import migrations
 
 async def init_models():
     try:
-        async with engine.begin() as conn:
-            # await conn.run_sync(Base.metadata.drop_all) # Uncomment to reset DB
-            await conn.run_sync(Base.metadata.create_all)
-        print("Tables created successfully.")
+        version = await migrations.upgrade(engine)
+        print(f"Database schema is at version {version}.")
     except Exception as e:
-        print(f"Error creating tables: {e}")
+        print(f"Error migrating database: {e}")
+        raise
     finally:
         await engine.dispose()
 
@@ -1,10 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
-from .database import engine, Base
+from . import readiness
+from .services import guidance_jobs, question_stats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,17 +24,19 @@ async def lifespan(app: FastAPI):
     else:
         logger.error("DATABASE_URL is NOT set!")
 
-    try:
-        # Create tables on startup
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        logger.info("Database tables created successfully.")
-    except Exception as e:
-        logger.error(f"Error initializing database: {e}")
-        # Don't raise, so the app can still start and we can see logs
+    # Pool warm-up, schema check and cache loading run in the background;
+    # /health/ready reports when they're done
+    warm_up_task = asyncio.create_task(readiness.warm_up())
+    question_stats.start()
+    guidance_jobs.start()
         
     yield
 
+    warm_up_task.cancel()
+    await guidance_jobs.stop()
+    await question_stats.stop()
+    await readiness.shutdown()
+
 app = FastAPI(title="Stream Backend", lifespan=lifespan)
 
 # Configure CORS - Allow specific origins
@@ -47,15 +51,17 @@ app.add_middleware(
     allow_credentials=True,  # Enable credentials support
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After"],
 )
 
-from .routers import auth, quiz, admin, content, progress
+from .routers import auth, quiz, admin, content, progress, health
 
 app.include_router(auth.router)
 app.include_router(quiz.router)
 app.include_router(admin.router)
 app.include_router(content.router)
 app.include_router(progress.router)
+app.include_router(health.router)
 
 @app.get("/")
 async def root():
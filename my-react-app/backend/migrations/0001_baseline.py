@@ -0,0 +1,136 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Tables previously created by Base.metadata.create_all at startup"
+
+# The schema exactly as the old create_all produced it. Pinned as DDL rather than built from
+# models.py, so this version never changes; later changes belong in later migrations.
+# IF NOT EXISTS keeps this a no-op on databases bootstrapped by the old create_all.
+ENUMS = {
+    "approle": ("admin", "user"),
+    "quizdomain": ("programmer", "analytics", "tester"),
+    "difficultylevel": ("easy", "medium", "hard"),
+}
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id UUID NOT NULL,
+        email VARCHAR NOT NULL,
+        hashed_password VARCHAR NOT NULL,
+        is_active BOOLEAN,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+    """
+    CREATE TABLE IF NOT EXISTS profiles (
+        id UUID NOT NULL,
+        email VARCHAR NOT NULL,
+        full_name VARCHAR,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        FOREIGN KEY (id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_roles (
+        id UUID NOT NULL,
+        user_id UUID NOT NULL,
+        role approle NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS questions (
+        id UUID NOT NULL,
+        question_text TEXT NOT NULL,
+        option_1 TEXT NOT NULL,
+        option_2 TEXT NOT NULL,
+        option_3 TEXT NOT NULL,
+        option_4 TEXT NOT NULL,
+        correct_answer INTEGER NOT NULL,
+        domain quizdomain NOT NULL,
+        difficulty difficultylevel NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS quiz_attempts (
+        id UUID NOT NULL,
+        user_id UUID NOT NULL,
+        recommended_domain quizdomain NOT NULL,
+        programmer_score INTEGER NOT NULL,
+        analytics_score INTEGER NOT NULL,
+        tester_score INTEGER NOT NULL,
+        total_score INTEGER NOT NULL,
+        share_id UUID NOT NULL,
+        completed_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        UNIQUE (share_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS quiz_responses (
+        id UUID NOT NULL,
+        attempt_id UUID NOT NULL,
+        question_id UUID NOT NULL,
+        selected_answer INTEGER NOT NULL,
+        is_correct BOOLEAN NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        FOREIGN KEY (attempt_id) REFERENCES quiz_attempts (id),
+        FOREIGN KEY (question_id) REFERENCES questions (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS roadmaps (
+        id UUID NOT NULL,
+        domain VARCHAR NOT NULL,
+        step_number INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS resources (
+        id UUID NOT NULL,
+        domain VARCHAR NOT NULL,
+        title TEXT NOT NULL,
+        link TEXT NOT NULL,
+        type VARCHAR NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_progress (
+        id UUID NOT NULL,
+        user_id UUID NOT NULL,
+        roadmap_step_id UUID NOT NULL,
+        is_completed BOOLEAN,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (roadmap_step_id) REFERENCES roadmaps (id)
+    )
+    """,
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for name, labels in ENUMS.items():
+        exists = await conn.scalar(text("SELECT 1 FROM pg_type WHERE typname = :name"), {"name": name})
+        if not exists:
+            await conn.execute(text(f"CREATE TYPE {name} AS ENUM ({', '.join(repr(label) for label in labels)})"))
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
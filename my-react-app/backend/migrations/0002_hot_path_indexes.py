@@ -0,0 +1,27 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Indexes for per-user and per-domain lookups; unique progress per roadmap step"
+
+STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS ix_quiz_attempts_user_completed ON quiz_attempts (user_id, completed_at)",
+    "CREATE INDEX IF NOT EXISTS ix_quiz_responses_attempt_id ON quiz_responses (attempt_id)",
+    "CREATE INDEX IF NOT EXISTS ix_user_roles_user_id ON user_roles (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_roadmaps_domain_step ON roadmaps (domain, step_number)",
+    "CREATE INDEX IF NOT EXISTS ix_resources_domain ON resources (domain)",
+    "CREATE INDEX IF NOT EXISTS ix_questions_domain_difficulty ON questions (domain, difficulty)",
+    # Keep only the newest row per (user, step) before enforcing uniqueness
+    """
+    DELETE FROM user_progress older
+    USING user_progress newer
+    WHERE older.user_id = newer.user_id
+      AND older.roadmap_step_id = newer.roadmap_step_id
+      AND (older.created_at, older.id) < (newer.created_at, newer.id)
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_user_progress_user_step ON user_progress (user_id, roadmap_step_id)",
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
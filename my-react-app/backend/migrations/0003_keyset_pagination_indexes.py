@@ -0,0 +1,17 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Indexes matching the keyset pagination order of attempts and users listings"
+
+STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS ix_quiz_attempts_completed_id ON quiz_attempts (completed_at, id)",
+    # Supersedes ix_quiz_attempts_user_completed for both lookups and paging
+    "CREATE INDEX IF NOT EXISTS ix_quiz_attempts_user_completed_id ON quiz_attempts (user_id, completed_at, id)",
+    "DROP INDEX IF EXISTS ix_quiz_attempts_user_completed",
+    "CREATE INDEX IF NOT EXISTS ix_users_created_id ON users (created_at, id)",
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
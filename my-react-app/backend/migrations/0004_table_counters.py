@@ -0,0 +1,75 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Row counters for the admin dashboard, maintained by triggers"
+
+# Tables whose row counts back /admin/stats
+COUNTED_TABLES = ["questions", "users", "quiz_attempts"]
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS table_counters (
+        table_name TEXT NOT NULL,
+        slot SMALLINT NOT NULL,
+        row_count BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (table_name, slot)
+    )
+    """,
+    # Statement-level, so bulk inserts cost one counter update. Writes are spread over
+    # 16 slots so concurrent inserts don't all queue on one row lock until commit.
+    """
+    CREATE OR REPLACE FUNCTION maintain_table_counter() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        delta BIGINT;
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            DELETE FROM table_counters WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        ELSIF TG_OP = 'INSERT' THEN
+            SELECT count(*) INTO delta FROM new_rows;
+        ELSE
+            SELECT -count(*) INTO delta FROM old_rows;
+        END IF;
+        IF delta <> 0 THEN
+            INSERT INTO table_counters (table_name, slot, row_count)
+            VALUES (TG_TABLE_NAME, floor(random() * 16)::smallint, delta)
+            ON CONFLICT (table_name, slot) DO UPDATE SET row_count = table_counters.row_count + EXCLUDED.row_count;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+]
+
+TABLE_STATEMENTS = [
+    # Block writes while the triggers go in and the counter is seeded, so no row is missed or counted twice
+    "LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE",
+    "DROP TRIGGER IF EXISTS {table}_count_insert ON {table}",
+    "DROP TRIGGER IF EXISTS {table}_count_delete ON {table}",
+    "DROP TRIGGER IF EXISTS {table}_count_truncate ON {table}",
+    """
+    CREATE TRIGGER {table}_count_insert AFTER INSERT ON {table}
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_table_counter()
+    """,
+    """
+    CREATE TRIGGER {table}_count_delete AFTER DELETE ON {table}
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_table_counter()
+    """,
+    """
+    CREATE TRIGGER {table}_count_truncate AFTER TRUNCATE ON {table}
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_table_counter()
+    """,
+    "DELETE FROM table_counters WHERE table_name = '{table}'",
+    "INSERT INTO table_counters (table_name, slot, row_count) SELECT '{table}', 0, count(*) FROM {table}",
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
+    for table in COUNTED_TABLES:
+        for statement in TABLE_STATEMENTS:
+            await conn.execute(text(statement.format(table=table)))
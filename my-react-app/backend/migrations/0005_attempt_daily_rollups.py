@@ -0,0 +1,24 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Per-day, per-domain attempt rollups for admin analytics"
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS attempt_daily_rollups (
+        day DATE NOT NULL,
+        recommended_domain quizdomain NOT NULL,
+        attempts BIGINT NOT NULL DEFAULT 0,
+        programmer_score_sum BIGINT NOT NULL DEFAULT 0,
+        analytics_score_sum BIGINT NOT NULL DEFAULT 0,
+        tester_score_sum BIGINT NOT NULL DEFAULT 0,
+        total_score_sum BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, recommended_domain)
+    )
+    """,
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
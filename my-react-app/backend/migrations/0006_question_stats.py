@@ -0,0 +1,42 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Per-question serve/answer/correct counters, seeded from existing responses"
+
+STATEMENTS = [
+    # No foreign key: counters are flushed in batches and must not fail on a deleted question
+    """
+    CREATE TABLE IF NOT EXISTS question_stats (
+        question_id UUID PRIMARY KEY,
+        times_served BIGINT NOT NULL DEFAULT 0,
+        times_answered BIGINT NOT NULL DEFAULT 0,
+        times_correct BIGINT NOT NULL DEFAULT 0,
+        option_1_count BIGINT NOT NULL DEFAULT 0,
+        option_2_count BIGINT NOT NULL DEFAULT 0,
+        option_3_count BIGINT NOT NULL DEFAULT 0,
+        option_4_count BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    """,
+    # Serves weren't recorded before; every past answer was served at least once
+    """
+    INSERT INTO question_stats (
+        question_id, times_served, times_answered, times_correct,
+        option_1_count, option_2_count, option_3_count, option_4_count
+    )
+    SELECT
+        question_id, count(*), count(*), count(*) FILTER (WHERE is_correct),
+        count(*) FILTER (WHERE selected_answer = 1),
+        count(*) FILTER (WHERE selected_answer = 2),
+        count(*) FILTER (WHERE selected_answer = 3),
+        count(*) FILTER (WHERE selected_answer = 4)
+    FROM quiz_responses
+    GROUP BY question_id
+    ON CONFLICT (question_id) DO NOTHING
+    """,
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
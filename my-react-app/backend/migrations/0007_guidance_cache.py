@@ -0,0 +1,27 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Persistent cache of AI career guidance keyed by prompt inputs"
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS guidance_cache (
+        cache_key TEXT PRIMARY KEY,
+        prompt_version TEXT NOT NULL,
+        recommended_domain quizdomain NOT NULL,
+        programmer_score INTEGER NOT NULL,
+        analytics_score INTEGER NOT NULL,
+        tester_score INTEGER NOT NULL,
+        total_score INTEGER NOT NULL,
+        guidance JSONB NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        expires_at TIMESTAMPTZ NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_guidance_cache_expires_at ON guidance_cache (expires_at)",
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,15 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Store precomputed AI guidance and its job status on quiz attempts"
+
+STATEMENTS = [
+    "ALTER TABLE quiz_attempts ADD COLUMN IF NOT EXISTS guidance JSONB",
+    "ALTER TABLE quiz_attempts ADD COLUMN IF NOT EXISTS guidance_status VARCHAR(16)",
+    "ALTER TABLE quiz_attempts ADD COLUMN IF NOT EXISTS guidance_updated_at TIMESTAMPTZ",
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
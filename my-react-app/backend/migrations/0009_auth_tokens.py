@@ -0,0 +1,36 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Token revocation versions and refresh tokens"
+
+# Older databases got these tables from the baseline's create_all; IF NOT EXISTS skips them there
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS token_revocations (
+        user_id UUID NOT NULL,
+        token_version INTEGER NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (user_id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS refresh_tokens (
+        id UUID NOT NULL,
+        user_id UUID NOT NULL,
+        token_hash VARCHAR NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        revoked_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_refresh_tokens_user_id ON refresh_tokens (user_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_refresh_tokens_token_hash ON refresh_tokens (token_hash)",
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,13 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Link rotated refresh tokens to the token that replaced them"
+
+STATEMENTS = [
+    "ALTER TABLE refresh_tokens ADD COLUMN IF NOT EXISTS replaced_by UUID",
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,17 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+description = "Spread attempt rollup writes over slots"
+
+# As with table_counters, concurrent submissions upsert one of 16 slots per (day, domain)
+# instead of all queueing on one row lock until commit; readers sum the slots.
+STATEMENTS = [
+    "ALTER TABLE attempt_daily_rollups ADD COLUMN IF NOT EXISTS slot SMALLINT NOT NULL DEFAULT 0",
+    "ALTER TABLE attempt_daily_rollups DROP CONSTRAINT IF EXISTS attempt_daily_rollups_pkey",
+    "ALTER TABLE attempt_daily_rollups ADD CONSTRAINT attempt_daily_rollups_pkey PRIMARY KEY (day, recommended_domain, slot)",
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,99 @@
+"""
+Versioned schema migrations.
+
+Each module in this package named NNNN_description.py defines `description` and
+`async def upgrade(conn)`; the four-digit prefix is its version. `python -m backend.init_db`
+applies pending migrations, while the app itself only checks that the schema is current.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from dataclasses import dataclass
+from typing import Callable, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_MODULE_NAME = re.compile(r"^(\d{4})_\w+$")
+# Arbitrary key for pg_advisory_xact_lock so concurrent deploys apply migrations one at a time
+_LOCK_KEY = 812_004_117
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    description: str
+    upgrade: Callable
+
+
+def discover() -> List[Migration]:
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append(Migration(int(match.group(1)), module_info.name, module.description, module.upgrade))
+    migrations.sort(key=lambda migration: migration.version)
+    return migrations
+
+
+def latest_version() -> int:
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    """Schema version recorded in the database; 0 when no migration has run yet."""
+    exists = await conn.scalar(text("SELECT to_regclass('schema_migrations') IS NOT NULL"))
+    if not exists:
+        return 0
+    return await conn.scalar(text("SELECT coalesce(max(version), 0) FROM schema_migrations"))
+
+
+async def check(engine: AsyncEngine) -> bool:
+    """Return True when the database is at the latest version; log the gap otherwise."""
+    async with engine.connect() as conn:
+        version = await current_version(conn)
+    expected = latest_version()
+    if version < expected:
+        logger.error(f"Database schema is at version {version}, expected {expected}. Run `python -m backend.init_db`.")
+        return False
+    return True
+
+
+async def upgrade(engine: AsyncEngine) -> int:
+    """Apply every pending migration, each in its own transaction. Returns the final version."""
+    expected = latest_version()
+    async with engine.connect() as conn:
+        version = await current_version(conn)
+    if version >= expected:
+        return version
+
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version INTEGER PRIMARY KEY,"
+            " name VARCHAR NOT NULL,"
+            " applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        ))
+
+    version = 0
+    for migration in discover():
+        async with engine.begin() as conn:
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+            version = await current_version(conn)
+            if migration.version <= version:
+                continue
+            logger.info(f"Applying migration {migration.name}: {migration.description}")
+            await migration.upgrade(conn)
+            await conn.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                {"version": migration.version, "name": migration.name},
+            )
+            version = migration.version
+    return version
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, DateTime, Enum, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, SmallInteger, BigInteger, Boolean, ForeignKey, Date, DateTime, Enum, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -22,6 +22,9 @@ class DifficultyLevel(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -47,6 +50,9 @@ class Profile(Base):
 
 class UserRole(Base):
     __tablename__ = "user_roles"
+    __table_args__ = (
+        Index("ix_user_roles_user_id", "user_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -57,6 +63,9 @@ class UserRole(Base):
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        Index("ix_questions_domain_difficulty", "domain", "difficulty"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     question_text = Column(Text, nullable=False)
@@ -74,6 +83,10 @@ class Question(Base):
 
 class QuizAttempt(Base):
     __tablename__ = "quiz_attempts"
+    __table_args__ = (
+        Index("ix_quiz_attempts_user_completed_id", "user_id", "completed_at", "id"),
+        Index("ix_quiz_attempts_completed_id", "completed_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -84,12 +97,19 @@ class QuizAttempt(Base):
     total_score = Column(Integer, default=0, nullable=False)
     share_id = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
     completed_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Filled in by the background guidance jobs (services/guidance_jobs.py)
+    guidance = Column(JSONB, nullable=True)
+    guidance_status = Column(String(16), nullable=True)
+    guidance_updated_at = Column(DateTime(timezone=True), nullable=True)
 
     user = relationship("User", back_populates="attempts")
     responses = relationship("QuizResponse", back_populates="attempt")
 
 class QuizResponse(Base):
     __tablename__ = "quiz_responses"
+    __table_args__ = (
+        Index("ix_quiz_responses_attempt_id", "attempt_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     attempt_id = Column(UUID(as_uuid=True), ForeignKey("quiz_attempts.id"), nullable=False)
@@ -103,6 +123,9 @@ class QuizResponse(Base):
 
 class Roadmap(Base):
     __tablename__ = "roadmaps"
+    __table_args__ = (
+        Index("ix_roadmaps_domain_step", "domain", "step_number"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     domain = Column(String, nullable=False)
@@ -113,6 +136,9 @@ class Roadmap(Base):
 
 class Resource(Base):
     __tablename__ = "resources"
+    __table_args__ = (
+        Index("ix_resources_domain", "domain"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     domain = Column(String, nullable=False)
@@ -123,6 +149,9 @@ class Resource(Base):
 
 class UserProgress(Base):
     __tablename__ = "user_progress"
+    __table_args__ = (
+        Index("uq_user_progress_user_step", "user_id", "roadmap_step_id", unique=True),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -132,3 +161,78 @@ class UserProgress(Base):
 
     user = relationship("User", back_populates="progress")
     roadmap_step = relationship("Roadmap")
+
+class TokenRevocation(Base):
+    __tablename__ = "token_revocations"
+
+    # Only users whose tokens were revoked have a row; everyone else is at version 0
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    token_version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class AttemptDailyRollup(Base):
+    __tablename__ = "attempt_daily_rollups"
+
+    # UTC day; updated by create_attempt and rebuilt by backfill_rollups.py.
+    # A (day, domain) total is the sum over its slots (migration 0011)
+    day = Column(Date, primary_key=True)
+    recommended_domain = Column(Enum(QuizDomain), primary_key=True)
+    slot = Column(SmallInteger, primary_key=True, default=0)
+    attempts = Column(BigInteger, nullable=False, default=0)
+    programmer_score_sum = Column(BigInteger, nullable=False, default=0)
+    analytics_score_sum = Column(BigInteger, nullable=False, default=0)
+    tester_score_sum = Column(BigInteger, nullable=False, default=0)
+    total_score_sum = Column(BigInteger, nullable=False, default=0)
+
+class QuestionStat(Base):
+    __tablename__ = "question_stats"
+
+    # Flushed in batches by services/question_stats.py; no FK so a deleted question can't fail a flush
+    question_id = Column(UUID(as_uuid=True), primary_key=True)
+    times_served = Column(BigInteger, nullable=False, default=0)
+    times_answered = Column(BigInteger, nullable=False, default=0)
+    times_correct = Column(BigInteger, nullable=False, default=0)
+    option_1_count = Column(BigInteger, nullable=False, default=0)
+    option_2_count = Column(BigInteger, nullable=False, default=0)
+    option_3_count = Column(BigInteger, nullable=False, default=0)
+    option_4_count = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class GuidanceCacheEntry(Base):
+    __tablename__ = "guidance_cache"
+    __table_args__ = (
+        Index("ix_guidance_cache_expires_at", "expires_at"),
+    )
+
+    # sha256 of the prompt version, model and normalized inputs; see services/guidance_cache.py
+    cache_key = Column(Text, primary_key=True)
+    prompt_version = Column(Text, nullable=False)
+    recommended_domain = Column(Enum(QuizDomain), nullable=False)
+    programmer_score = Column(Integer, nullable=False)
+    analytics_score = Column(Integer, nullable=False)
+    tester_score = Column(Integer, nullable=False)
+    total_score = Column(Integer, nullable=False)
+    guidance = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+class TableCounter(Base):
+    __tablename__ = "table_counters"
+
+    # Maintained by triggers (migration 0004); a table's row count is the sum over its slots
+    table_name = Column(Text, primary_key=True)
+    slot = Column(SmallInteger, primary_key=True)
+    row_count = Column(BigInteger, nullable=False, default=0)
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    # Only a SHA-256 digest of the token is stored
+    token_hash = Column(String, unique=True, index=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    # Set when the token was rotated (rather than revoked); the token issued in its place
+    replaced_by = Column(UUID(as_uuid=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
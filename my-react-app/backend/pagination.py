@@ -0,0 +1,73 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+import orjson
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .fast_json import FastJSONResponse
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Response header carrying the cursor for the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """`limit` and `cursor` query parameters shared by paginated listings."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    payload = orjson.dumps([sort_value.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = orjson.loads(payload)
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def keyset_page(
+    db: AsyncSession,
+    statement: Select,
+    sort_column,
+    id_column,
+    page: PageParams,
+) -> FastJSONResponse:
+    """
+    Return one page of `statement`, newest first by (sort_column, id_column).
+    Each page starts where the cursor left off, so deep pages cost the same as the
+    first one given an index on (sort_column, id_column). Both columns must be selected.
+    Rows with a NULL sort value can't be ordered against a cursor and are left out.
+    """
+    statement = statement.where(sort_column.is_not(None))
+    if page.cursor:
+        statement = statement.where(tuple_(sort_column, id_column) < tuple_(*decode_cursor(page.cursor)))
+    statement = statement.order_by(sort_column.desc(), id_column.desc()).limit(page.limit + 1)
+
+    result = await db.execute(statement)
+    keys = list(result.keys())
+    rows = result.all()
+
+    response = FastJSONResponse([dict(zip(keys, row)) for row in rows[:page.limit]])
+    if len(rows) > page.limit:
+        last = rows[page.limit - 1]._mapping
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last[sort_column.key], last[id_column.key])
+    return response
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from . import models, auth
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+# Postgres channel used to tell every API process that a user's roles or status changed
+INVALIDATION_CHANNEL = "principal_invalidation"
+
+# When enabled, tokens carrying uid/roles/ver claims are authorized without touching the users tables
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+TOKEN_VERSION_REFRESH_SECONDS = float(os.getenv("TOKEN_VERSION_REFRESH_SECONDS", "30"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, as resolved from the token subject."""
+    id: UUID
+    email: str
+    is_active: bool
+    roles: Tuple[models.AppRole, ...]
+
+    @property
+    def is_admin(self) -> bool:
+        return models.AppRole.admin in self.roles
+
+
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def principal_from_user(user: models.User) -> Principal:
+    """Build a Principal from a User loaded with its roles."""
+    return Principal(
+        id=user.id,
+        email=user.email,
+        is_active=user.is_active,
+        roles=tuple(user_role.role for user_role in user.roles),
+    )
+
+
+def principal_from_claims(payload: Dict[str, Any]) -> Optional[Principal]:
+    """Rebuild a Principal from access token claims, or None for tokens issued without them."""
+    if "uid" not in payload or "roles" not in payload:
+        return None
+    try:
+        return Principal(
+            id=UUID(payload["uid"]),
+            email=payload["sub"],
+            # Tokens from before a deactivation are retired by deactivate_user's revocation
+            is_active=payload.get("active", True),
+            roles=tuple(models.AppRole(role) for role in payload["roles"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenVersions:
+    """
+    In-memory copy of the token_revocations table.
+    Reloaded at most every TOKEN_VERSION_REFRESH_SECONDS, or sooner after a NOTIFY.
+    """
+
+    def __init__(self):
+        self._versions: Dict[UUID, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def mark_stale(self) -> None:
+        self._loaded_at = None
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= TOKEN_VERSION_REFRESH_SECONDS
+
+    async def get(self, db: AsyncSession, user_id: UUID) -> int:
+        if self._is_stale():
+            async with self._lock:
+                if self._is_stale():
+                    result = await db.execute(
+                        select(models.TokenRevocation.user_id, models.TokenRevocation.token_version)
+                    )
+                    self._versions = {row.user_id: row.token_version for row in result}
+                    self._loaded_at = time.monotonic()
+        return self._versions.get(user_id, 0)
+
+
+token_versions = TokenVersions()
+
+
+async def current_token_version(db: AsyncSession, user_id: UUID) -> int:
+    """The user's token version straight from the database, bypassing `token_versions`."""
+    version = await db.scalar(
+        select(models.TokenRevocation.token_version).where(models.TokenRevocation.user_id == user_id)
+    )
+    return version or 0
+
+
+async def issue_access_token(db: AsyncSession, principal: Principal) -> str:
+    """
+    Create an access token carrying the principal's id, roles and current token version.
+    The version is read from the database: a cached one may predate a revocation this
+    process hasn't heard about yet, and the new token would be rejected once it had.
+    """
+    claims = {
+        "sub": principal.email,
+        "uid": str(principal.id),
+        "roles": [role.value for role in principal.roles],
+        "active": principal.is_active,
+        "ver": await current_token_version(db, principal.id),
+    }
+    return auth.create_access_token(
+        data=claims, expires_delta=timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+
+async def revoke_tokens(db: AsyncSession, user_id: UUID, email: str) -> None:
+    """
+    Invalidate every access token already issued to a user and notify running servers.
+    Takes effect when the surrounding transaction commits.
+    """
+    statement = pg_insert(models.TokenRevocation).values(user_id=user_id, token_version=1)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[models.TokenRevocation.user_id],
+            set_={"token_version": models.TokenRevocation.token_version + 1, "updated_at": func.now()},
+        )
+    )
+    await notify_principal_changed(db, email)
+
+
+async def deactivate_user(db: AsyncSession, user_id: UUID, email: str) -> None:
+    """
+    Mark a user inactive and revoke their tokens, which `principal_from_claims` relies on.
+    Takes effect when the surrounding transaction commits.
+    """
+    await db.execute(update(models.User).where(models.User.id == user_id).values(is_active=False))
+    await revoke_tokens(db, user_id, email)
+    await db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.user_id == user_id)
+        .where(models.RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+    )
+
+
+async def load_principal(db: AsyncSession, email: str) -> Optional[Principal]:
+    """Resolve a token subject to a Principal, hitting the database only on a cache miss."""
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(
+        select(models.User).options(selectinload(models.User.roles)).where(models.User.email == email)
+    )
+    user = result.scalars().first()
+    if user is None:
+        return None
+
+    principal = principal_from_user(user)
+    principal_cache.set(email, principal)
+    return principal
+
+
+def invalidate_principal(email: Optional[str] = None) -> None:
+    """Forget one cached principal, or all of them when no email is given."""
+    if email is None:
+        principal_cache.clear()
+    else:
+        principal_cache.pop(email)
+
+
+def _on_invalidation(email: str) -> None:
+    invalidate_principal(email or None)
+    token_versions.mark_stale()
+
+
+async def notify_principal_changed(db: AsyncSession, email: str) -> None:
+    """
+    Queue an invalidation for every API process listening on the database.
+    Delivered when the surrounding transaction commits.
+    """
+    await db.execute(text("SELECT pg_notify(:channel, :email)"), {"channel": INVALIDATION_CHANNEL, "email": email})
+
+
+async def listen_for_invalidations(database_url: str) -> Optional[asyncpg.Connection]:
+    """
+    Open a dedicated connection that drops cached principals on NOTIFY.
+    Returns None when LISTEN is unavailable (e.g. behind a transaction pooler);
+    the cache TTL still bounds staleness in that case.
+    """
+    try:
+        connection = await asyncpg.connect(database_url)
+        await connection.add_listener(
+            INVALIDATION_CHANNEL,
+            lambda _connection, _pid, _channel, payload: _on_invalidation(payload),
+        )
+        return connection
+    except Exception as e:
+        logger.warning(f"Principal invalidation listener unavailable: {e}")
+        return None
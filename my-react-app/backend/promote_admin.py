@@ -2,7 +2,7 @@ import asyncio
 import os
 import sys
 import argparse
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select
 from dotenv import load_dotenv
@@ -11,16 +11,14 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.models import User, UserRole, AppRole
-from backend.database import Base
+from backend.principals import revoke_tokens
+from backend.database import Base, make_engine, normalize_database_url
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL:
-    if DATABASE_URL.startswith("postgres://"):
-        DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+asyncpg://", 1)
-    elif DATABASE_URL.startswith("postgresql://"):
-        DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+    DATABASE_URL = normalize_database_url(DATABASE_URL)
 
 # Fix for Render: Append ?ssl=require if not already present and not localhost
 if DATABASE_URL and "localhost" not in DATABASE_URL and "?ssl=" not in DATABASE_URL:
@@ -31,7 +29,7 @@ async def promote_user(email: str):
         print("Error: DATABASE_URL is not set.")
         return
 
-    engine = create_async_engine(DATABASE_URL)
+    engine = make_engine(DATABASE_URL)
     async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
     async with async_session() as session:
@@ -56,8 +54,11 @@ async def promote_user(email: str):
             print(f"Promoting '{email}' to Admin...")
             new_role = UserRole(user_id=user.id, role=AppRole.admin)
             session.add(new_role)
+            # Retire tokens issued with the old role claims; running API servers
+            # also drop their cached copy of this user on commit
+            await revoke_tokens(session, user.id, email)
             await session.commit()
-            print(f"Success! '{email}' is now an Admin.")
+            print(f"Success! '{email}' is now an Admin. They need to sign in again to use it.")
 
     await engine.dispose()
 
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import asyncpg
+from sqlalchemy import text
+
+from . import migrations, principals
+from .database import engine, DB_POOL_SIZE, DB_PGBOUNCER_MODE
+from .services import answer_key, gemini_service
+
+logger = logging.getLogger(__name__)
+
+# Connections opened ahead of the first request
+DB_POOL_WARM_CONNECTIONS = int(os.getenv("DB_POOL_WARM_CONNECTIONS", "2"))
+WARM_UP_RETRY_SECONDS = float(os.getenv("WARM_UP_RETRY_SECONDS", "5"))
+
+
+class Readiness:
+    """What the background warm-up has finished; reported by /health/ready."""
+
+    def __init__(self):
+        self.database = False
+        self.schema = False
+        self.caches = False
+        self.last_error: Optional[str] = None
+        self.listener: Optional[asyncpg.Connection] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.database and self.schema and self.caches
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "database": self.database,
+            "schema": self.schema,
+            "caches": self.caches,
+            "last_error": self.last_error,
+        }
+
+
+state = Readiness()
+
+
+async def _ping() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _warm_up_once() -> None:
+    # Open several pool connections concurrently so the first requests don't pay for the handshakes
+    await asyncio.gather(*(_ping() for _ in range(max(1, min(DB_POOL_WARM_CONNECTIONS, DB_POOL_SIZE)))))
+    state.database = True
+
+    state.schema = await migrations.check(engine)
+    if not state.schema:
+        raise RuntimeError("Database schema is behind; waiting for migrations")
+
+    await answer_key.get_answer_key()
+    state.caches = True
+
+    # Drop cached principals when roles change in another process (e.g. promote_admin.py).
+    # LISTEN doesn't survive transaction pooling, so rely on the cache TTL behind pgbouncer.
+    if not DB_PGBOUNCER_MODE and state.listener is None:
+        state.listener = await principals.listen_for_invalidations(
+            engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        )
+
+    if gemini_service.GEMINI_API_KEY:
+        # Keep the SDK import off the event loop and out of the first guidance job
+        try:
+            await gemini_service.load_model()
+        except Exception as e:
+            logger.warning(f"Gemini SDK unavailable: {e}")
+
+
+async def warm_up() -> None:
+    """
+    Background startup work, retried until it succeeds, so the server accepts
+    connections right away instead of blocking on the database.
+    """
+    while True:
+        try:
+            await _warm_up_once()
+            state.last_error = None
+            logger.info("Warm-up complete; ready to serve traffic.")
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            state.last_error = str(e)
+            logger.error(f"Warm-up failed, retrying in {WARM_UP_RETRY_SECONDS}s: {e}")
+            await asyncio.sleep(WARM_UP_RETRY_SECONDS)
+
+
+async def shutdown() -> None:
+    if state.listener is not None:
+        await state.listener.close()
+        state.listener = None
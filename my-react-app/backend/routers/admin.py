@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Dict, Any
-from .. import models, schemas, deps
+from sqlalchemy import select
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+from .. import models, schemas, deps, auth, principals, db_metrics, fast_json, pagination
+from ..pagination import PageParams
+from ..database import engine, read_engine
+from ..services import admin_stats, answer_key, attempt_export, attempt_rollups, guidance_cache, guidance_jobs, question_stats
 
 router = APIRouter(
     prefix="/admin",
@@ -11,40 +16,82 @@ router = APIRouter(
 )
 
 @router.get("/stats")
-async def get_admin_stats(db: AsyncSession = Depends(deps.get_db)):
-    # Count questions
-    questions_result = await db.execute(select(func.count(models.Question.id)))
-    questions_count = questions_result.scalar() or 0
-    
-    # Count users
-    users_result = await db.execute(select(func.count(models.User.id)))
-    users_count = users_result.scalar() or 0
-    
-    # Count attempts
-    attempts_result = await db.execute(select(func.count(models.QuizAttempt.id)))
-    attempts_count = attempts_result.scalar() or 0
-    
+async def get_admin_stats(
+    approximate: bool = Query(False, description="Use planner estimates instead of exact counters"),
+    db: AsyncSession = Depends(deps.get_read_db)
+):
+    # Constant time either way: no count(*) over the tables themselves
+    if approximate:
+        return await admin_stats.approximate_totals(db)
+    return await admin_stats.counter_totals(db)
+
+@router.get("/analytics/daily")
+async def get_daily_analytics(
+    since: Optional[date] = Query(None, description="First UTC day (default: 30 days ago)"),
+    until: Optional[date] = Query(None, description="UTC day to stop before (default: tomorrow)"),
+    domain: Optional[models.QuizDomain] = None,
+    db: AsyncSession = Depends(deps.get_read_db)
+):
+    # Reads the pre-aggregated rollups: at most one row per day, domain and slot
+    until = until or datetime.now(timezone.utc).date() + timedelta(days=1)
+    since = since or until - timedelta(days=30)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return await attempt_rollups.daily(db, since, until, domain)
+
+@router.get("/metrics")
+async def get_metrics():
     return {
-        "totalQuestions": questions_count,
-        "totalUsers": users_count,
-        "assessmentsTaken": attempts_count
+        "passwordHashing": auth.password_hash_stats(),
+        "principalCache": principals.principal_cache.stats(),
+        "databasePool": db_metrics.pool_stats(engine),
+        "readDatabasePool": db_metrics.pool_stats(read_engine) if read_engine is not engine else None,
+        "slowQueries": db_metrics.query_stats.slow_statements,
+        "questionStatsPending": len(question_stats.buffer),
+        "guidanceCache": guidance_cache.memory.stats(),
+        "queries": db_metrics.query_stats.top()
     }
 
 @router.post("/questions", response_model=schemas.Question)
 async def create_question(
     question_in: schemas.QuestionCreate,
-    db: AsyncSession = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.Principal = Depends(deps.get_current_admin_user)
 ):
     new_question = models.Question(**question_in.dict())
     db.add(new_question)
     await db.commit()
     await db.refresh(new_question)
+    answer_key.invalidate()
+    deps.mark_recent_write(current_user.email)
     return new_question
 
+@router.get("/questions/stats")
+async def get_question_stats(
+    sort: question_stats.StatsSort = question_stats.StatsSort.accuracy,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    domain: Optional[models.QuizDomain] = None,
+    difficulty: Optional[models.DifficultyLevel] = None,
+    min_answered: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(deps.get_read_db)
+):
+    # Counters lag live traffic by up to QUESTION_STATS_FLUSH_SECONDS
+    return await question_stats.question_stats(
+        db,
+        sort=sort,
+        descending=order == "desc",
+        domain=domain,
+        difficulty=difficulty,
+        min_answered=min_answered,
+        limit=limit
+    )
+
 @router.delete("/questions/{question_id}")
 async def delete_question(
     question_id: str,
-    db: AsyncSession = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.Principal = Depends(deps.get_current_admin_user)
 ):
     result = await db.execute(select(models.Question).where(models.Question.id == question_id))
     question = result.scalars().first()
@@ -54,16 +101,68 @@ async def delete_question(
         
     await db.delete(question)
     await db.commit()
+    answer_key.invalidate()
+    deps.mark_recent_write(current_user.email)
     return {"message": "Question deleted successfully"}
 
+@router.post("/guidance/warm")
+async def warm_guidance(
+    limit: int = Query(100, ge=1, le=1000),
+    since: Optional[datetime] = Query(None, description="Only attempts completed at or after this time"),
+    db: AsyncSession = Depends(deps.get_db)
+):
+    # Queues attempts without guidance on this process's background workers, newest first
+    queued = await guidance_jobs.warm(db, limit=limit, since=since)
+    return {"queued": queued}
+
+@router.delete("/guidance-cache")
+async def purge_guidance_cache(
+    expired_only: bool = False,
+    db: AsyncSession = Depends(deps.get_db)
+):
+    # Other processes drop their in-memory copies within GUIDANCE_MEMORY_TTL_SECONDS
+    deleted = await guidance_cache.purge(db, expired_only=expired_only)
+    return {"deleted": deleted}
+
 @router.get("/users", response_model=List[schemas.User]) # Or a specific AdminUserSchema
-async def get_users(db: AsyncSession = Depends(deps.get_db)):
-    result = await db.execute(select(models.User))
-    users = result.scalars().all()
-    return users
+async def get_users(
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(deps.get_db)
+):
+    return await pagination.keyset_page(
+        db,
+        select(*fast_json.schema_columns(models.User, schemas.User)),
+        models.User.created_at,
+        models.User.id,
+        page
+    )
+
+@router.get("/attempts/export")
+async def export_attempts(
+    format: attempt_export.ExportFormat = attempt_export.ExportFormat.ndjson,
+    since: Optional[datetime] = Query(None, description="Attempts completed at or after this time"),
+    until: Optional[datetime] = Query(None, description="Attempts completed before this time"),
+    include_responses: bool = False
+):
+    if format == attempt_export.ExportFormat.csv:
+        body, media_type = attempt_export.export_csv(since, until, include_responses), "text/csv"
+    else:
+        body, media_type = attempt_export.export_ndjson(since, until, include_responses), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="quiz-attempts.{format.value}"'}
+    )
 
 @router.get("/attempts/all", response_model=List[schemas.QuizAttempt])
-async def get_all_attempts(db: AsyncSession = Depends(deps.get_db)):
-    result = await db.execute(select(models.QuizAttempt).order_by(models.QuizAttempt.completed_at.desc()))
-    attempts = result.scalars().all()
-    return attempts
+async def get_all_attempts(
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(deps.get_db)
+):
+    return await pagination.keyset_page(
+        db,
+        select(*fast_json.schema_columns(models.QuizAttempt, schemas.QuizAttempt)),
+        models.QuizAttempt.completed_at,
+        models.QuizAttempt.id,
+        page
+    )
@@ -1,50 +1,100 @@
+from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import timedelta
-from .. import models, schemas, auth, deps
+from sqlalchemy import select, insert, update, delete, func, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from uuid import uuid4
+from sqlalchemy.orm import aliased, selectinload
+from .. import models, schemas, auth, deps, principals
 
 router = APIRouter(
     prefix="/auth",
     tags=["auth"],
 )
 
+async def _issue_refresh_token(db: AsyncSession, user_id, token_id=None) -> str:
+    token, token_hash, expires_at = auth.create_refresh_token()
+    db.add(models.RefreshToken(id=token_id or uuid4(), user_id=user_id, token_hash=token_hash, expires_at=expires_at))
+    # Drop the user's expired tokens; revoked ones are kept until they expire for reuse detection
+    await db.execute(
+        delete(models.RefreshToken)
+        .where(models.RefreshToken.user_id == user_id)
+        .where(models.RefreshToken.expires_at <= func.now())
+    )
+    await db.commit()
+    return token
+
 @router.post("/register", response_model=schemas.Token)
 async def register(user: schemas.UserCreate, db: AsyncSession = Depends(deps.get_db)):
     try:
-        # Check if user exists
-        result = await db.execute(select(models.User).where(models.User.email == user.email))
-        db_user = result.scalars().first()
-        if db_user:
+        # Cheap check first so duplicate signups don't take a slot on the hashing pool;
+        # ON CONFLICT below still covers two signups racing for the same email
+        taken = await db.execute(select(models.User.id).where(models.User.email == user.email).limit(1))
+        if taken.first() is not None:
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        # Create user
-        hashed_password = auth.get_password_hash(user.password)
-        new_user = models.User(email=user.email, hashed_password=hashed_password)
-        db.add(new_user)
-        await db.flush()  # Generate ID without committing transaction
-        
-        # Create profile
-        new_profile = models.Profile(id=new_user.id, email=new_user.email, full_name=user.full_name or user.email)
-        db.add(new_profile)
+        hashed_password = await auth.get_password_hash_async(user.password)
+        user_id = uuid4()
+        refresh_token, refresh_token_hash, refresh_expires_at = auth.create_refresh_token()
         
-        # Assign default role
-        new_role = models.UserRole(user_id=new_user.id, role=models.AppRole.user)
-        db.add(new_role)
+        # Create user, profile, default role and refresh token in one statement.
+        # ON CONFLICT leaves new_user empty for a taken email, so nothing else is inserted.
+        new_user = (
+            pg_insert(models.User)
+            .values(id=user_id, email=user.email, hashed_password=hashed_password, is_active=True)
+            .on_conflict_do_nothing(index_elements=[models.User.email])
+            .returning(models.User.id, models.User.email)
+            .cte("new_user")
+        )
+        new_profile = insert(models.Profile).from_select(
+            ["id", "email", "full_name"],
+            select(new_user.c.id, new_user.c.email, literal(user.full_name or user.email))
+        ).cte("new_profile")
+        new_role = insert(models.UserRole).from_select(
+            ["id", "user_id", "role"],
+            select(
+                literal(uuid4(), models.UserRole.id.type),
+                new_user.c.id,
+                literal(models.AppRole.user, models.UserRole.role.type)
+            )
+        ).cte("new_role")
+        new_refresh_token = insert(models.RefreshToken).from_select(
+            ["id", "user_id", "token_hash", "expires_at"],
+            select(
+                literal(uuid4(), models.RefreshToken.id.type),
+                new_user.c.id,
+                literal(refresh_token_hash),
+                literal(refresh_expires_at, models.RefreshToken.expires_at.type)
+            )
+        ).cte("new_refresh_token")
         
+        result = await db.execute(
+            select(new_user.c.id).add_cte(new_profile, new_role, new_refresh_token)
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=400, detail="Email already registered")
         await db.commit()
-        await db.refresh(new_user)
         
         # Create access token
-        access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = auth.create_access_token(
-            data={"sub": new_user.email}, expires_delta=access_token_expires
+        principal = principals.Principal(
+            id=user_id,
+            email=user.email,
+            is_active=True,
+            roles=(models.AppRole.user,)
         )
-        return {"access_token": access_token, "token_type": "bearer"}
+        access_token = await principals.issue_access_token(db, principal)
+        return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
     except HTTPException as he:
         await db.rollback()
         raise he
+    except auth.PasswordHasherBusy:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         await db.rollback()
         print(f"Registration error: {str(e)}")
@@ -55,36 +105,113 @@ async def register(user: schemas.UserCreate, db: AsyncSession = Depends(deps.get
 @router.post("/login", response_model=schemas.Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(deps.get_db)):
     try:
-        result = await db.execute(select(models.User).where(models.User.email == form_data.username))
+        result = await db.execute(
+            select(models.User)
+            .options(selectinload(models.User.roles))
+            .where(models.User.email == form_data.username)
+        )
         user = result.scalars().first()
         
-        if not user or not auth.verify_password(form_data.password, user.hashed_password):
+        if not user or not await auth.verify_password_async(form_data.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = auth.create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
-        )
-        return {"access_token": access_token, "token_type": "bearer"}
+        access_token = await principals.issue_access_token(db, principals.principal_from_user(user))
+        refresh_token = await _issue_refresh_token(db, user.id)
+        return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
     except HTTPException as he:
         raise he
+    except auth.PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         print(f"Login error: {str(e)}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh(body: schemas.RefreshRequest, db: AsyncSession = Depends(deps.get_db)):
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    token_hash = auth.hash_refresh_token(body.refresh_token)
+    now = func.now()
+    successor_id = uuid4()
+
+    # Rotate: each refresh token can be redeemed exactly once
+    result = await db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.token_hash == token_hash)
+        .where(models.RefreshToken.revoked_at.is_(None))
+        .where(models.RefreshToken.expires_at > now)
+        .values(revoked_at=now, replaced_by=successor_id)
+        .returning(models.RefreshToken.user_id)
+    )
+    user_id = result.scalar_one_or_none()
+
+    if user_id is None:
+        # Already rotated moments ago with its successor still live: another tab refreshed with
+        # the same token at the same time, so issue a further token instead of treating it as a replay
+        successor = aliased(models.RefreshToken)
+        grace = timedelta(seconds=auth.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+        result = await db.execute(
+            select(
+                models.RefreshToken.user_id,
+                ((models.RefreshToken.revoked_at > now - grace) & successor.id.is_not(None)).label("concurrent"),
+            )
+            .outerjoin(
+                successor,
+                (successor.id == models.RefreshToken.replaced_by)
+                & successor.revoked_at.is_(None)
+                & (successor.expires_at > now),
+            )
+            .where(models.RefreshToken.token_hash == token_hash)
+            .where(models.RefreshToken.revoked_at.is_not(None))
+        )
+        reused = result.first()
+        if reused is None:
+            raise invalid_token
+        if not reused.concurrent:
+            # A rotated token being replayed means it leaked; revoke every session of that user
+            await db.execute(
+                update(models.RefreshToken)
+                .where(models.RefreshToken.user_id == reused.user_id)
+                .where(models.RefreshToken.revoked_at.is_(None))
+                .values(revoked_at=now)
+            )
+            await db.commit()
+            raise invalid_token
+        user_id = reused.user_id
+
+    result = await db.execute(
+        select(models.User)
+        .options(selectinload(models.User.roles))
+        .where(models.User.id == user_id)
+    )
+    user = result.scalars().first()
+    if not user or not user.is_active:
+        await db.commit()
+        raise invalid_token
+
+    access_token = await principals.issue_access_token(db, principals.principal_from_user(user))
+    refresh_token = await _issue_refresh_token(db, user.id, successor_id)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
 @router.get("/me")
 async def read_users_me(
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: deps.Principal = Depends(deps.get_current_active_user),
     db: AsyncSession = Depends(deps.get_db)
 ):
     # Fetch user with profile and roles
-    from sqlalchemy.orm import selectinload
     result = await db.execute(
         select(models.User)
         .options(selectinload(models.User.profile))
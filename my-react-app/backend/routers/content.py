@@ -4,8 +4,8 @@ from sqlalchemy import select
 from typing import List, Optional
 from uuid import UUID
 
-from .. import models, schemas
-from ..deps import get_db, get_current_admin_user, get_current_active_user
+from .. import models, schemas, fast_json
+from ..deps import Principal, get_db, get_read_db, get_current_admin_user, get_current_active_user, mark_recent_write
 
 router = APIRouter(
     prefix="/content",
@@ -19,33 +19,33 @@ router = APIRouter(
 async def create_roadmap(
     roadmap: schemas.RoadmapCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     db_roadmap = models.Roadmap(**roadmap.model_dump())
     db.add(db_roadmap)
     await db.commit()
     await db.refresh(db_roadmap)
+    mark_recent_write(current_user.email)
     return db_roadmap
 
 @router.get("/roadmaps", response_model=List[schemas.Roadmap])
 async def read_roadmaps(
     domain: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    query = select(models.Roadmap)
+    query = select(*fast_json.schema_columns(models.Roadmap, schemas.Roadmap))
     if domain:
         query = query.where(models.Roadmap.domain == domain)
     # Order by step_number
     query = query.order_by(models.Roadmap.step_number)
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await fast_json.rows_response(db, query)
 
 @router.delete("/roadmaps/{roadmap_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_roadmap(
     roadmap_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     query = select(models.Roadmap).where(models.Roadmap.id == roadmap_id)
     result = await db.execute(query)
@@ -55,6 +55,7 @@ async def delete_roadmap(
     
     await db.delete(roadmap)
     await db.commit()
+    mark_recent_write(current_user.email)
     return None
 
 # Resources
@@ -63,31 +64,31 @@ async def delete_roadmap(
 async def create_resource(
     resource: schemas.ResourceCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     db_resource = models.Resource(**resource.model_dump())
     db.add(db_resource)
     await db.commit()
     await db.refresh(db_resource)
+    mark_recent_write(current_user.email)
     return db_resource
 
 @router.get("/resources", response_model=List[schemas.Resource])
 async def read_resources(
     domain: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    query = select(models.Resource)
+    query = select(*fast_json.schema_columns(models.Resource, schemas.Resource))
     if domain:
         query = query.where(models.Resource.domain == domain)
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await fast_json.rows_response(db, query)
 
 @router.delete("/resources/{resource_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_resource(
     resource_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     query = select(models.Resource).where(models.Resource.id == resource_id)
     result = await db.execute(query)
@@ -97,4 +98,5 @@ async def delete_resource(
     
     await db.delete(resource)
     await db.commit()
+    mark_recent_write(current_user.email)
     return None
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Response, status
+from .. import readiness
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+@router.get("/live")
+async def live():
+    # The process is up and the event loop is responsive
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def ready(response: Response):
+    # Pool warmed, schema current and caches loaded
+    if not readiness.state.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if readiness.state.ready else "starting",
+        **readiness.state.as_dict()
+    }
@@ -5,7 +5,7 @@ from typing import List
 from uuid import UUID
 
 from .. import models, schemas
-from ..deps import get_db, get_current_active_user
+from ..deps import Principal, get_db, get_current_active_user
 
 router = APIRouter(
     prefix="/progress",
@@ -16,7 +16,7 @@ router = APIRouter(
 @router.get("/", response_model=List[schemas.UserProgress])
 async def get_user_progress(
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     query = select(models.UserProgress).where(models.UserProgress.user_id == current_user.id)
     result = await db.execute(query)
@@ -26,7 +26,7 @@ async def get_user_progress(
 async def update_progress(
     progress: schemas.UserProgressCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     # Check if already exists
     query = select(models.UserProgress).where(
@@ -57,7 +57,7 @@ async def update_progress(
 async def delete_progress(
     roadmap_step_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     query = select(models.UserProgress).where(
         models.UserProgress.user_id == current_user.id,
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, insert, func
 from sqlalchemy.orm import selectinload
-from typing import List
-from uuid import UUID
-from .. import models, schemas, deps
+from typing import List, Optional
+from uuid import UUID, uuid4
+from .. import models, schemas, deps, fast_json, pagination
+from ..pagination import PageParams
+from ..services import answer_key, attempt_rollups, question_sampler, question_stats, guidance_jobs, guidance_stream
 
 router = APIRouter(
     prefix="/quiz",
@@ -13,48 +16,57 @@ router = APIRouter(
 
 @router.get("/questions", response_model=List[schemas.Question])
 async def get_questions(
-    db: AsyncSession = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user)
+    domain: Optional[models.QuizDomain] = None,
+    difficulty: Optional[models.DifficultyLevel] = None,
+    stratify: bool = False,
+    db: AsyncSession = Depends(deps.get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_user)
 ):
-    # Fetch 30 random questions from the database
-    result = await db.execute(
-        select(models.Question)
-        .order_by(func.random())
-        .limit(30)
+    # Draw 30 random question ids from the cached pool, then fetch just those rows
+    questions = await question_sampler.sample_questions(
+        db,
+        domain=domain,
+        difficulty=difficulty,
+        stratify=stratify
     )
-    questions = result.scalars().all()
+    # Admins list questions through this route (and their own runs are test runs),
+    # so only count questions served to regular users
+    if not current_user.is_admin:
+        question_stats.buffer.record_served(question.id for question in questions)
     return questions
 
 @router.get("/attempts", response_model=List[schemas.QuizAttempt])
 async def get_attempts(
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: deps.Principal = Depends(deps.get_current_active_user)
 ):
-    result = await db.execute(
-        select(models.QuizAttempt)
-        .where(models.QuizAttempt.user_id == current_user.id)
-        .order_by(models.QuizAttempt.completed_at.desc())
+    return await pagination.keyset_page(
+        db,
+        select(*fast_json.schema_columns(models.QuizAttempt, schemas.QuizAttempt))
+        .where(models.QuizAttempt.user_id == current_user.id),
+        models.QuizAttempt.completed_at,
+        models.QuizAttempt.id,
+        page
     )
-    attempts = result.scalars().all()
-    return attempts
 
 @router.post("/attempts", response_model=schemas.QuizAttempt)
 async def create_attempt(
     attempt_in: schemas.QuizAttemptCreate,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: deps.Principal = Depends(deps.get_current_active_user)
 ):
     # Calculate scores based on responses
-    # Fetch all questions to verify answers
-    result = await db.execute(select(models.Question))
-    questions = {q.id: q for q in result.scalars().all()}
+    # Grade against the cached answer key instead of loading the question bank
+    questions = await answer_key.lookup(db, (response.question_id for response in attempt_in.responses))
     
     programmer_score = 0
     analytics_score = 0
     tester_score = 0
     total_score = 0
     
-    db_responses = []
+    attempt_id = uuid4()
+    response_rows = []
     
     for response in attempt_in.responses:
         question = questions.get(response.question_id)
@@ -72,11 +84,12 @@ async def create_attempt(
             elif question.domain == models.QuizDomain.tester:
                 tester_score += 1
         
-        db_responses.append(models.QuizResponse(
-            question_id=response.question_id,
-            selected_answer=response.selected_answer,
-            is_correct=is_correct
-        ))
+        response_rows.append({
+            "attempt_id": attempt_id,
+            "question_id": response.question_id,
+            "selected_answer": response.selected_answer,
+            "is_correct": is_correct
+        })
 
     # Determine recommended domain
     scores = {
@@ -86,26 +99,41 @@ async def create_attempt(
     }
     recommended_domain = max(scores, key=scores.get)
     
-    # Create attempt
-    new_attempt = models.QuizAttempt(
-        user_id=current_user.id,
-        recommended_domain=recommended_domain,
-        programmer_score=programmer_score,  # 1 mark per correct answer
-        analytics_score=analytics_score,    # 1 mark per correct answer
-        tester_score=tester_score,          # 1 mark per correct answer
-        total_score=total_score             # 1 mark per correct answer
+    # Create attempt, reading server defaults back with RETURNING instead of a refresh
+    result = await db.execute(
+        insert(models.QuizAttempt)
+        .values(
+            id=attempt_id,
+            user_id=current_user.id,
+            recommended_domain=recommended_domain,
+            programmer_score=programmer_score,  # 1 mark per correct answer
+            analytics_score=analytics_score,    # 1 mark per correct answer
+            tester_score=tester_score,          # 1 mark per correct answer
+            total_score=total_score,            # 1 mark per correct answer
+            guidance_status=guidance_jobs.PENDING,
+            guidance_updated_at=func.now()
+        )
+        .returning(models.QuizAttempt)
     )
+    new_attempt = schemas.QuizAttempt.model_validate(result.scalar_one())
     
-    db.add(new_attempt)
-    await db.flush()  # Flush to get the ID without committing
+    # Add all responses with a single multi-row INSERT
+    if response_rows:
+        await db.execute(insert(models.QuizResponse), response_rows)
     
-    # Add responses
-    for resp in db_responses:
-        resp.attempt_id = new_attempt.id
-        db.add(resp)
+    # Keep the admin analytics rollups current in the same transaction
+    await attempt_rollups.record_attempt(db, new_attempt)
     
     await db.commit()
-    await db.refresh(new_attempt)
+    deps.mark_recent_write(current_user.email)
+    
+    # Generate guidance now so it's usually ready by the time the results page asks
+    guidance_jobs.enqueue(attempt_id)
+    
+    # Buffered and flushed to question_stats in batches; admin runs aren't counted, as in get_questions
+    if not current_user.is_admin:
+        for row in response_rows:
+            question_stats.buffer.record_answer(row["question_id"], row["selected_answer"], row["is_correct"])
     
     return new_attempt
 
@@ -113,7 +141,7 @@ async def create_attempt(
 async def get_attempt_details(
     attempt_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: deps.Principal = Depends(deps.get_current_active_user)
 ):
     result = await db.execute(
         select(models.QuizAttempt)
@@ -134,14 +162,14 @@ async def get_attempt_details(
 async def get_ai_guidance(
     attempt_id: str,
     db: AsyncSession = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: deps.Principal = Depends(deps.get_current_active_user)
 ):
     """
-    Generate AI-powered career guidance for a specific quiz attempt.
-    Returns personalized roadmap, job profiles, skills to improve, and resources.
+    AI-powered career guidance for a specific quiz attempt: personalized roadmap,
+    job profiles, skills to improve, and resources.
+    Generated in the background after submission; answers 202 {"status": "pending"}
+    until it's ready, and null when generation failed so the frontend falls back.
     """
-    from ..services import gemini_service
-    
     # Fetch the attempt
     result = await db.execute(
         select(models.QuizAttempt)
@@ -153,30 +181,49 @@ async def get_ai_guidance(
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
     
-    try:
-        # Generate AI guidance
-        guidance = await gemini_service.generate_career_guidance(
-            recommended_domain=attempt.recommended_domain.value,
-            programmer_score=attempt.programmer_score,
-            analytics_score=attempt.analytics_score,
-            tester_score=attempt.tester_score,
-            total_score=attempt.total_score
-        )
-        
-        return guidance
-        
-    except ValueError as e:
-        # Log the error but return None/Empty to frontend so it can fallback gracefully
-        print(f"AI Guidance Error: {e}")
-        return None
-    except Exception as e:
-        print(f"AI Guidance Unexpected Error: {e}")
+    if attempt.guidance_status == guidance_jobs.READY:
+        return attempt.guidance
+    
+    if attempt.guidance_status is None or guidance_jobs.is_stale(attempt):
+        # Attempts from before background jobs, lost jobs, and failures old enough to retry
+        await guidance_jobs.requeue(db, attempt)
+    elif attempt.guidance_status == guidance_jobs.FAILED:
         return None
+    
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"status": guidance_jobs.PENDING})
+
+@router.get("/attempts/{attempt_id}/ai-guidance/stream")
+async def stream_ai_guidance(
+    attempt_id: UUID,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_user)
+):
+    """
+    The same guidance as server-sent events: a `section` event ({"key", "value"}) as
+    each top-level section of the model's answer completes, then `done`, or `error`
+    if generation fails. Lets the results page render the first section without
+    waiting for the whole generation.
+    """
+    result = await db.execute(
+        select(models.QuizAttempt)
+        .where(models.QuizAttempt.id == attempt_id)
+        .where(models.QuizAttempt.user_id == current_user.id)
+    )
+    attempt = result.scalars().first()
+    if not attempt:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    
+    return StreamingResponse(
+        await guidance_stream.open_stream(db, attempt),
+        media_type="text/event-stream",
+        # Proxies (nginx, Render) must pass each event through as soon as it's written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/public/attempts/{share_id}", response_model=schemas.QuizAttempt)
 async def get_public_attempt(
     share_id: UUID,
-    db: AsyncSession = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     result = await db.execute(
         select(models.QuizAttempt)
@@ -1,7 +1,7 @@
 import asyncio
 import os
 import sys
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select
 from dotenv import load_dotenv
@@ -12,16 +12,13 @@ FORCE_RESEED = os.getenv("FORCE_RESEED", "false").lower() == "true"
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.models import Question, Roadmap, Resource, QuizDomain, DifficultyLevel
-from backend.database import Base
+from backend.database import Base, make_engine, normalize_database_url
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL:
-    if DATABASE_URL.startswith("postgres://"):
-        DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+asyncpg://", 1)
-    elif DATABASE_URL.startswith("postgresql://"):
-        DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+    DATABASE_URL = normalize_database_url(DATABASE_URL)
 
 # Fix for Render: Append ?ssl=require if not already present and not localhost
 if DATABASE_URL and "localhost" not in DATABASE_URL and "?ssl=" not in DATABASE_URL:
@@ -923,7 +920,7 @@ async def seed_data():
         print("Error: DATABASE_URL is not set.")
         return
 
-    engine = create_async_engine(DATABASE_URL)
+    engine = make_engine(DATABASE_URL)
     async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
     async with async_session() as session:
@@ -0,0 +1,42 @@
+from typing import Dict
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+
+# Dashboard field -> counted table (see migration 0004)
+STAT_TABLES = {
+    "totalQuestions": "questions",
+    "totalUsers": "users",
+    "assessmentsTaken": "quiz_attempts",
+}
+
+
+async def counter_totals(db: AsyncSession) -> Dict[str, int]:
+    """Exact row counts from the trigger-maintained counters; one small indexed read."""
+    result = await db.execute(
+        select(models.TableCounter.table_name, func.sum(models.TableCounter.row_count))
+        .where(models.TableCounter.table_name.in_(STAT_TABLES.values()))
+        .group_by(models.TableCounter.table_name)
+    )
+    counts = {table_name: int(total) for table_name, total in result}
+    return {field: counts.get(table_name, 0) for field, table_name in STAT_TABLES.items()}
+
+
+async def approximate_totals(db: AsyncSession) -> Dict[str, int]:
+    """
+    Planner estimates from pg_class.reltuples, refreshed by VACUUM/ANALYZE.
+    Tables that were never analyzed fall back to the counters.
+    """
+    result = await db.execute(
+        text("SELECT relname, reltuples FROM pg_class WHERE oid = ANY(CAST(:tables AS regclass[]))"),
+        {"tables": list(STAT_TABLES.values())},
+    )
+    estimates = {relname: reltuples for relname, reltuples in result}
+    if any(estimates.get(table_name, -1) < 0 for table_name in STAT_TABLES.values()):
+        exact = await counter_totals(db)
+    return {
+        field: int(estimates[table_name]) if estimates.get(table_name, -1) >= 0 else exact[field]
+        for field, table_name in STAT_TABLES.items()
+    }
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import time
+from typing import Dict, Iterable, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..database import SessionLocal
+
+# Safety net for questions added or removed outside this process (seed scripts, psql)
+ANSWER_KEY_TTL_SECONDS = int(os.getenv("ANSWER_KEY_TTL_SECONDS", "300"))
+
+
+class AnswerKeyEntry(NamedTuple):
+    correct_answer: int
+    domain: models.QuizDomain
+    difficulty: models.DifficultyLevel
+
+
+_COLUMNS = (
+    models.Question.id,
+    models.Question.correct_answer,
+    models.Question.domain,
+    models.Question.difficulty,
+)
+
+_index: Optional[Dict[UUID, AnswerKeyEntry]] = None
+_loaded_at = 0.0
+_generation = 0
+_lock = asyncio.Lock()
+
+
+def _entries(rows) -> Dict[UUID, AnswerKeyEntry]:
+    return {row.id: AnswerKeyEntry(row.correct_answer, row.domain, row.difficulty) for row in rows}
+
+
+async def get_answer_key() -> Dict[UUID, AnswerKeyEntry]:
+    """
+    Return the process-wide answer key (question_id -> correct answer, domain, difficulty).
+    The whole bank is loaded once and kept until invalidated or the TTL expires. It is
+    always loaded from the primary: reloads follow admin edits, and a lagging replica
+    would pin the old bank for the whole TTL.
+    """
+    global _index, _loaded_at
+    index = _index
+    if index is not None and time.monotonic() - _loaded_at < ANSWER_KEY_TTL_SECONDS:
+        return index
+
+    async with _lock:
+        if _index is not None and time.monotonic() - _loaded_at < ANSWER_KEY_TTL_SECONDS:
+            return _index
+
+        generation = _generation
+        async with SessionLocal() as db:
+            result = await db.execute(select(*_COLUMNS))
+            loaded = _entries(result)
+
+        # Don't publish a snapshot that raced with an invalidation
+        if generation == _generation:
+            _index = loaded
+            _loaded_at = time.monotonic()
+        return loaded
+
+
+async def lookup(db: AsyncSession, question_ids: Iterable[UUID]) -> Dict[UUID, AnswerKeyEntry]:
+    """
+    Return answer key entries for the given question ids.
+    Ids missing from the cached index are fetched by primary key and merged in,
+    so questions inserted by another process are still graded. Cached hits are
+    confirmed by primary key and held with FOR KEY SHARE until the caller commits,
+    so a question deleted elsewhere is skipped rather than breaking the responses' foreign key.
+    """
+    index = await get_answer_key()
+    wanted = set(question_ids)
+    found = {qid: index[qid] for qid in wanted if qid in index}
+    missing = wanted - found.keys()
+
+    if found:
+        result = await db.execute(
+            select(models.Question.id)
+            .where(models.Question.id.in_(found))
+            .with_for_update(key_share=True)
+        )
+        existing = set(result.scalars())
+        if len(existing) != len(found):
+            for qid in found.keys() - existing:
+                del found[qid]
+            invalidate()
+
+    if missing:
+        generation = _generation
+        result = await db.execute(
+            select(*_COLUMNS).where(models.Question.id.in_(missing)).with_for_update(key_share=True)
+        )
+        fetched = _entries(result)
+        found.update(fetched)
+        if fetched and generation == _generation and _index is index:
+            index.update(fetched)
+
+    return found
+
+
+def invalidate() -> None:
+    """Drop the cached answer key; the next lookup reloads it."""
+    global _index, _generation
+    _index = None
+    _generation += 1
@@ -0,0 +1,121 @@
+import csv
+import enum
+import io
+import os
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Sequence
+
+from sqlalchemy import Select, select
+
+from .. import models, schemas, fast_json
+from ..database import read_engine
+
+# Rows fetched per round trip from the server-side cursor; also the size of each streamed chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+ATTEMPT_FIELDS = list(schemas.QuizAttempt.model_fields)
+RESPONSE_FIELDS = list(schemas.QuizResponse.model_fields)
+
+
+class ExportFormat(str, enum.Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Filters without an offset are taken as UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _statement(since: Optional[datetime], until: Optional[datetime], include_responses: bool) -> Select:
+    columns = fast_json.schema_columns(models.QuizAttempt, schemas.QuizAttempt)
+    order_by = [models.QuizAttempt.completed_at, models.QuizAttempt.id]
+    if include_responses:
+        columns += [getattr(models.QuizResponse, name).label(f"response_{name}") for name in RESPONSE_FIELDS]
+        order_by += [models.QuizResponse.created_at, models.QuizResponse.id]
+
+    statement = select(*columns)
+    if include_responses:
+        # Outer join so attempts without responses are still exported
+        statement = statement.select_from(models.QuizAttempt).outerjoin(
+            models.QuizResponse, models.QuizResponse.attempt_id == models.QuizAttempt.id
+        )
+    if since is not None:
+        statement = statement.where(models.QuizAttempt.completed_at >= _as_utc(since))
+    if until is not None:
+        statement = statement.where(models.QuizAttempt.completed_at < _as_utc(until))
+    return statement.order_by(*order_by)
+
+
+async def _batches(statement: Select) -> AsyncIterator[Sequence]:
+    """
+    Stream rows through a server-side cursor on a dedicated read connection,
+    so the export outlives the request's session and memory stays at one batch.
+    """
+    async with read_engine.connect() as conn:
+        result = await conn.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for batch in result.partitions():
+            yield batch
+
+
+async def export_ndjson(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_responses: bool = False,
+) -> AsyncIterator[bytes]:
+    """One attempt per line; with `include_responses`, each carries a `responses` array."""
+    width = len(ATTEMPT_FIELDS)
+    id_index = ATTEMPT_FIELDS.index("id")
+    current = None
+
+    async for batch in _batches(_statement(since, until, include_responses)):
+        lines: List[bytes] = []
+        for row in batch:
+            if not include_responses:
+                lines.append(fast_json.dumps(dict(zip(ATTEMPT_FIELDS, row))))
+                continue
+            # Rows arrive grouped by attempt; emit each attempt once its responses are collected
+            if current is None or current["id"] != row[id_index]:
+                if current is not None:
+                    lines.append(fast_json.dumps(current))
+                current = dict(zip(ATTEMPT_FIELDS, row[:width]), responses=[])
+            if row[width] is not None:
+                current["responses"].append(dict(zip(RESPONSE_FIELDS, row[width:])))
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+    if current is not None:
+        yield fast_json.dumps(current) + b"\n"
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def export_csv(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_responses: bool = False,
+) -> AsyncIterator[bytes]:
+    """One row per attempt, or per response (attempt columns repeated) with `include_responses`."""
+    header = ATTEMPT_FIELDS + ([f"response_{name}" for name in RESPONSE_FIELDS] if include_responses else [])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # Send the header before the query runs so the download starts right away
+    writer.writerow(header)
+    yield buffer.getvalue().encode()
+
+    async for batch in _batches(_statement(since, until, include_responses)):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode()
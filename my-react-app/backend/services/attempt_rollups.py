@@ -0,0 +1,127 @@
+import random
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import BigInteger, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from .. import models, schemas
+
+Rollup = models.AttemptDailyRollup
+
+SCORE_FIELDS = ["programmer_score", "analytics_score", "tester_score", "total_score"]
+
+# Concurrent attempts upsert a random slot so they don't serialize on one row per (day, domain)
+ROLLUP_SLOTS = 16
+
+
+def _utc_day(completed_at: datetime) -> date:
+    return completed_at.astimezone(timezone.utc).date()
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+async def record_attempt(db: AsyncSession, attempt: schemas.QuizAttempt) -> None:
+    """Add one attempt to a slot of its day's rollup; runs in the caller's transaction."""
+    values = {f"{field}_sum": getattr(attempt, field) for field in SCORE_FIELDS}
+    statement = pg_insert(Rollup).values(
+        day=_utc_day(attempt.completed_at),
+        recommended_domain=attempt.recommended_domain,
+        slot=random.randrange(ROLLUP_SLOTS),
+        attempts=1,
+        **values,
+    )
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[Rollup.day, Rollup.recommended_domain, Rollup.slot],
+            set_={
+                "attempts": Rollup.attempts + 1,
+                **{name: getattr(Rollup, name) + statement.excluded[name] for name in values},
+            },
+        )
+    )
+
+
+async def backfill(
+    engine: AsyncEngine,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    chunk_days: int = 31,
+) -> int:
+    """
+    Rebuild rollups for [since, until) from quiz_attempts, one chunk of days per transaction.
+    Defaults to the whole attempts history. Returns the number of days covered.
+    """
+    async with engine.connect() as conn:
+        first, last = (await conn.execute(
+            select(func.min(models.QuizAttempt.completed_at), func.max(models.QuizAttempt.completed_at))
+        )).one()
+    if first is None:
+        return 0
+    since = since or _utc_day(first)
+    until = until or _utc_day(last) + timedelta(days=1)
+
+    day_bucket = func.date(func.timezone("UTC", models.QuizAttempt.completed_at))
+    start = since
+    while start < until:
+        end = min(start + timedelta(days=chunk_days), until)
+        async with engine.begin() as conn:
+            # Attempts committing meanwhile wait on their rollup upsert until this chunk commits,
+            # so each one is counted exactly once: either here or by its own upsert afterwards.
+            await conn.execute(text("LOCK TABLE attempt_daily_rollups IN EXCLUSIVE MODE"))
+            await conn.execute(delete(Rollup).where(Rollup.day >= start, Rollup.day < end))
+            aggregate = (
+                select(
+                    day_bucket,
+                    models.QuizAttempt.recommended_domain,
+                    func.count(),
+                    *(func.sum(getattr(models.QuizAttempt, field)) for field in SCORE_FIELDS),
+                )
+                .where(
+                    models.QuizAttempt.completed_at >= _day_start(start),
+                    models.QuizAttempt.completed_at < _day_start(end),
+                )
+                .group_by(day_bucket, models.QuizAttempt.recommended_domain)
+            )
+            await conn.execute(
+                pg_insert(Rollup).from_select(
+                    ["day", "recommended_domain", "attempts", *(f"{field}_sum" for field in SCORE_FIELDS)],
+                    aggregate,
+                )
+            )
+        start = end
+    return (until - since).days
+
+
+async def daily(
+    db: AsyncSession,
+    since: date,
+    until: date,
+    domain: Optional[models.QuizDomain] = None,
+) -> List[Dict[str, Any]]:
+    """Attempts and average scores per (day, recommended domain) for [since, until)."""
+    sums = {
+        name: func.sum(getattr(Rollup, name)).cast(BigInteger).label(name)
+        for name in ["attempts", *(f"{field}_sum" for field in SCORE_FIELDS)]
+    }
+    query = select(Rollup.day, Rollup.recommended_domain, *sums.values()).where(Rollup.day >= since, Rollup.day < until)
+    if domain is not None:
+        query = query.where(Rollup.recommended_domain == domain)
+    result = await db.execute(
+        query.group_by(Rollup.day, Rollup.recommended_domain).order_by(Rollup.day, Rollup.recommended_domain)
+    )
+    return [
+        {
+            "day": row.day,
+            "recommended_domain": row.recommended_domain,
+            "attempts": row.attempts,
+            **{
+                f"avg_{field}": round(getattr(row, f"{field}_sum") / row.attempts, 2) if row.attempts else 0.0
+                for field in SCORE_FIELDS
+            },
+        }
+        for row in result
+    ]
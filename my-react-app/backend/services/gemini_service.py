@@ -1,40 +1,127 @@
+import asyncio
 import os
 import json
-from typing import Dict, Any
-import google.generativeai as genai
+from typing import Any, AsyncIterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Configure Gemini API
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+# Bump whenever the prompt below changes so cached guidance from the old prompt is not reused
+PROMPT_VERSION = "1"
+# Upper bound on one generation; the route falls back to static guidance after this
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+# Generations in flight per process, and how long a request waits for a free slot
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_QUEUE_TIMEOUT_SECONDS = float(os.getenv("GEMINI_QUEUE_TIMEOUT_SECONDS", "5"))
+
+class GuidanceUnavailable(Exception):
+    """Generation timed out or too many were already in flight."""
+
+_model = None
+_slots = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+def _build_model():
+    import google.generativeai as genai
     genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+async def load_model():
+    """
+    Import the Gemini SDK and build the model once. The import takes about a
+    second, so it runs in a thread; startup warm-up calls this ahead of the first request.
+    """
+    global _model
+    if _model is None:
+        _model = await asyncio.to_thread(_build_model)
+    return _model
+
+async def _acquire_slot() -> None:
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=GEMINI_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise GuidanceUnavailable(f"{GEMINI_MAX_CONCURRENCY} generations already in flight")
+
+# SectionParser states
+_SEEK_OBJECT, _EXPECT_KEY, _IN_KEY, _EXPECT_COLON, _IN_VALUE, _DONE = range(6)
 
-async def generate_career_guidance(
+class SectionParser:
+    """
+    Incremental parser for the model's streamed JSON reply. Feed it text as it arrives
+    and it returns each top-level (key, value) pair as soon as that value is complete.
+    Anything around the outermost object (markdown fences, prose) is ignored.
+    """
+
+    def __init__(self):
+        self._state = _SEEK_OBJECT
+        self._chars: List[str] = []
+        self._key: Optional[str] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def complete(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        sections: List[Tuple[str, Any]] = []
+        for char in text:
+            state = self._state
+            if state == _IN_VALUE:
+                if self._in_string:
+                    if self._escaped:
+                        self._escaped = False
+                    elif char == "\\":
+                        self._escaped = True
+                    elif char == '"':
+                        self._in_string = False
+                elif char == '"':
+                    self._in_string = True
+                elif char in "[{":
+                    self._depth += 1
+                elif self._depth:
+                    if char in "]}":
+                        self._depth -= 1
+                elif char in ",}":
+                    sections.append((self._key, json.loads("".join(self._chars))))
+                    self._chars = []
+                    self._state = _DONE if char == "}" else _EXPECT_KEY
+                    continue
+                self._chars.append(char)
+            elif state == _IN_KEY:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._key = json.loads('"' + "".join(self._chars) + '"')
+                    self._chars = []
+                    self._state = _EXPECT_COLON
+                    continue
+                self._chars.append(char)
+            elif state == _SEEK_OBJECT:
+                if char == "{":
+                    self._state = _EXPECT_KEY
+            elif state == _EXPECT_KEY:
+                if char == '"':
+                    self._state = _IN_KEY
+                elif char == "}":
+                    self._state = _DONE
+            elif state == _EXPECT_COLON:
+                if char == ":":
+                    self._state = _IN_VALUE
+        return sections
+
+def build_prompt(
     recommended_domain: str,
     programmer_score: int,
     analytics_score: int,
     tester_score: int,
     total_score: int
-) -> Dict[str, Any]:
-    """
-    Generate personalized career guidance using Gemini AI.
-    
-    Returns a dictionary with:
-    - description: Personalized description
-    - job_profiles: List of job profiles with demand and growth
-    - skills_to_improve: List of skills with priority
-    - learning_roadmap: List of learning steps
-    - resources: List of learning resources
-    - future_scope: Future career scope analysis
-    """
-    
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY not found in environment variables")
-    
-    # Create the prompt
-    prompt = f"""You are an expert career guidance counselor specializing in technology careers. 
+) -> str:
+    return f"""You are an expert career guidance counselor specializing in technology careers. 
 Based on the following career assessment quiz results, provide comprehensive, personalized career guidance.
 
 Assessment Results:
@@ -95,32 +182,37 @@ Important guidelines:
 
 Return ONLY the JSON object, no additional text."""
 
+async def stream_career_guidance(
+    recommended_domain: str,
+    programmer_score: int,
+    analytics_score: int,
+    tester_score: int,
+    total_score: int
+) -> AsyncIterator[str]:
+    """
+    Generate personalized career guidance with Gemini, yielding the raw response text
+    as the model produces it. The whole stream shares one GEMINI_TIMEOUT_SECONDS deadline.
+    """
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+    
+    prompt = build_prompt(recommended_domain, programmer_score, analytics_score, tester_score, total_score)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + GEMINI_TIMEOUT_SECONDS
+    
+    await _acquire_slot()
     try:
-        # Use Gemini to generate the response
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(prompt)
-        
-        # Extract the text response
-        response_text = response.text.strip()
-        
-        # Remove markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        # Parse JSON
-        guidance = json.loads(response_text)
-        
-        return guidance
-        
-    except json.JSONDecodeError as e:
-        print(f"JSON parsing error: {e}")
-        print(f"Response text: {response_text}")
-        raise ValueError(f"Failed to parse AI response as JSON: {e}")
-    except Exception as e:
-        print(f"Error generating career guidance: {e}")
-        raise
+        response = await asyncio.wait_for(
+            (await load_model()).generate_content_async(prompt, stream=True), timeout=GEMINI_TIMEOUT_SECONDS
+        )
+        chunks = response.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(deadline - loop.time(), 0))
+            except StopAsyncIteration:
+                return
+            yield chunk.text
+    except asyncio.TimeoutError:
+        raise GuidanceUnavailable(f"Generation took longer than {GEMINI_TIMEOUT_SECONDS}s")
+    finally:
+        _slots.release()
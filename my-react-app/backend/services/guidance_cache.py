@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..cache import TTLCache
+from ..database import SessionLocal
+from . import gemini_service
+
+logger = logging.getLogger(__name__)
+
+# How long generated guidance is reused from the database
+GUIDANCE_CACHE_TTL_SECONDS = float(os.getenv("GUIDANCE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# In-process tier; kept shorter so a purge reaches every process within this long
+GUIDANCE_MEMORY_TTL_SECONDS = float(os.getenv("GUIDANCE_MEMORY_TTL_SECONDS", "3600"))
+GUIDANCE_MEMORY_SIZE = int(os.getenv("GUIDANCE_MEMORY_SIZE", "4096"))
+
+memory = TTLCache(maxsize=GUIDANCE_MEMORY_SIZE, ttl=GUIDANCE_MEMORY_TTL_SECONDS)
+
+# Generations in progress in this process, by cache key
+_in_flight: Dict[str, "Generation"] = {}
+
+Entry = models.GuidanceCacheEntry
+
+
+def prompt_inputs(attempt) -> Dict[str, Any]:
+    return {
+        "recommended_domain": models.QuizDomain(attempt.recommended_domain),
+        "programmer_score": int(attempt.programmer_score),
+        "analytics_score": int(attempt.analytics_score),
+        "tester_score": int(attempt.tester_score),
+        "total_score": int(attempt.total_score),
+    }
+
+
+def cache_key(inputs: Dict[str, Any]) -> str:
+    """Everything the prompt depends on, plus the prompt version and model."""
+    parts = [
+        gemini_service.PROMPT_VERSION,
+        gemini_service.GEMINI_MODEL,
+        inputs["recommended_domain"].value,
+        *(str(inputs[name]) for name in ("programmer_score", "analytics_score", "tester_score", "total_score")),
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+async def lookup(db: AsyncSession, key: str) -> Optional[Dict[str, Any]]:
+    guidance = memory.get(key)
+    if guidance is not None:
+        return guidance
+
+    result = await db.execute(
+        select(Entry.guidance, Entry.expires_at)
+        .where(Entry.cache_key == key, Entry.expires_at > datetime.now(timezone.utc))
+    )
+    row = result.first()
+    if row is None:
+        return None
+    remaining = (row.expires_at - datetime.now(timezone.utc)).total_seconds()
+    memory.set(key, row.guidance, ttl=min(GUIDANCE_MEMORY_TTL_SECONDS, remaining))
+    return row.guidance
+
+
+async def store(db: AsyncSession, key: str, inputs: Dict[str, Any], guidance: Dict[str, Any]) -> None:
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=GUIDANCE_CACHE_TTL_SECONDS)
+    statement = pg_insert(Entry).values(
+        cache_key=key,
+        prompt_version=gemini_service.PROMPT_VERSION,
+        guidance=guidance,
+        expires_at=expires_at,
+        **inputs,
+    )
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[Entry.cache_key],
+            set_={"guidance": statement.excluded.guidance, "expires_at": statement.excluded.expires_at},
+        )
+    )
+    await db.commit()
+    memory.set(key, guidance)
+
+
+async def _store_generated(key: str, inputs: Dict[str, Any], guidance: Dict[str, Any]) -> None:
+    try:
+        # Own session: the generation can outlive the request that started it
+        async with SessionLocal() as db:
+            await store(db, key, inputs, guidance)
+    except Exception as e:
+        logger.error(f"Could not cache guidance {key[:12]}: {e}")
+        memory.set(key, guidance)
+
+
+class Generation:
+    """
+    The one Gemini call in progress for a cache key. Sections are parsed out of the
+    streamed reply as they complete, so streaming readers relay each one right away
+    while other callers just await `task` for the finished guidance.
+    """
+
+    def __init__(self, key: str, inputs: Dict[str, Any]):
+        self.sections: List[Tuple[str, Any]] = []
+        self._changed = asyncio.Event()
+        self.task = asyncio.create_task(self._run(key, inputs))
+        self.task.add_done_callback(lambda _: self._notify())
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _run(self, key: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        parser = gemini_service.SectionParser()
+        async for text in gemini_service.stream_career_guidance(
+            recommended_domain=inputs["recommended_domain"].value,
+            programmer_score=inputs["programmer_score"],
+            analytics_score=inputs["analytics_score"],
+            tester_score=inputs["tester_score"],
+            total_score=inputs["total_score"],
+        ):
+            sections = parser.feed(text)
+            if sections:
+                self.sections.extend(sections)
+                self._notify()
+        if not parser.complete:
+            raise ValueError("AI response ended before the JSON object was closed")
+        guidance = dict(self.sections)
+        await _store_generated(key, inputs, guidance)
+        return guidance
+
+    async def follow(self) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Every section so far, then each new one as it's parsed; raises if the generation
+        fails. Leaving early doesn't cancel the generation for anyone else.
+        """
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.sections):
+                yield self.sections[sent]
+                sent += 1
+            if self.task.done():
+                self.task.result()
+                return
+            await changed.wait()
+
+
+def _forget(key: str, generation: Generation) -> None:
+    if _in_flight.get(key) is generation:
+        del _in_flight[key]
+    # Mark the error as seen even if every waiter was cancelled before it arrived
+    if not generation.task.cancelled():
+        generation.task.exception()
+
+
+def generation(key: str, inputs: Dict[str, Any]) -> Generation:
+    """
+    One Gemini call per key per process: the generation already running for `key`,
+    or a new one. A failure reaches everyone following it and the next caller starts
+    afresh. Callers check `memory` first, since a generation may have just finished.
+    """
+    current = _in_flight.get(key)
+    if current is None:
+        current = _in_flight[key] = Generation(key, inputs)
+        current.task.add_done_callback(lambda _: _forget(key, current))
+    return current
+
+
+async def _coalesced(key: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    # A generation may have finished while this caller was checking the database
+    guidance = memory.get(key)
+    if guidance is not None:
+        return guidance
+    # A cancelled caller doesn't cancel the generation for the others
+    return await asyncio.shield(generation(key, inputs).task)
+
+
+async def career_guidance(db: AsyncSession, attempt) -> Dict[str, Any]:
+    """
+    Guidance for an attempt's scores: from memory, then the database, and only
+    then from Gemini. Failed generations are not cached.
+    """
+    inputs = prompt_inputs(attempt)
+    key = cache_key(inputs)
+    guidance = await lookup(db, key)
+    if guidance is None:
+        # Give the connection back to the pool for the seconds-long LLM call
+        await db.rollback()
+        guidance = await _coalesced(key, inputs)
+    return guidance
+
+
+async def purge(db: AsyncSession, expired_only: bool = False) -> int:
+    """Delete cached guidance (all of it, or only expired rows). Returns rows deleted."""
+    statement = delete(Entry)
+    if expired_only:
+        statement = statement.where(Entry.expires_at <= datetime.now(timezone.utc))
+    else:
+        memory.clear()
+    result = await db.execute(statement)
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..database import SessionLocal
+from . import guidance_cache
+
+logger = logging.getLogger(__name__)
+
+GUIDANCE_WORKERS = int(os.getenv("GUIDANCE_WORKERS", "2"))
+GUIDANCE_QUEUE_SIZE = int(os.getenv("GUIDANCE_QUEUE_SIZE", "1000"))
+# A job still pending after this long is assumed lost (e.g. its process restarted) and is queued again
+GUIDANCE_PENDING_TIMEOUT_SECONDS = float(os.getenv("GUIDANCE_PENDING_TIMEOUT_SECONDS", "120"))
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+Attempt = models.QuizAttempt
+
+_queue: "asyncio.Queue[UUID]" = asyncio.Queue(maxsize=GUIDANCE_QUEUE_SIZE)
+_workers: List[asyncio.Task] = []
+
+
+def enqueue(attempt_id: UUID) -> bool:
+    """Queue guidance for an attempt already marked pending. False when the queue is full."""
+    try:
+        _queue.put_nowait(attempt_id)
+        return True
+    except asyncio.QueueFull:
+        return False
+
+
+async def _set_status(db: AsyncSession, attempt_ids: Iterable[UUID], status: str, **values) -> None:
+    await db.execute(
+        update(Attempt)
+        .where(Attempt.id.in_(list(attempt_ids)))
+        .values(guidance_status=status, guidance_updated_at=func.now(), **values)
+    )
+    await db.commit()
+
+
+async def mark_ready(db: AsyncSession, attempt_id: UUID, guidance: dict) -> None:
+    await _set_status(db, [attempt_id], READY, guidance=guidance)
+
+
+async def process(attempt_id: UUID) -> None:
+    """Generate (or reuse cached) guidance for one attempt and store it on the attempt."""
+    async with SessionLocal() as db:
+        attempt = (await db.execute(select(Attempt).where(Attempt.id == attempt_id))).scalars().first()
+        if attempt is None or attempt.guidance_status == READY:
+            return
+        try:
+            guidance = await guidance_cache.career_guidance(db, attempt)
+        except Exception as e:
+            logger.warning(f"Guidance for attempt {attempt_id} failed: {e}")
+            await _set_status(db, [attempt_id], FAILED)
+            return
+        await mark_ready(db, attempt_id, guidance)
+
+
+async def _worker() -> None:
+    while True:
+        attempt_id = await _queue.get()
+        try:
+            await process(attempt_id)
+        except Exception as e:
+            logger.error(f"Guidance job for attempt {attempt_id} crashed: {e}")
+        finally:
+            _queue.task_done()
+
+
+def start(workers: int = GUIDANCE_WORKERS) -> None:
+    for _ in range(workers):
+        _workers.append(asyncio.create_task(_worker()))
+
+
+async def stop() -> None:
+    # Jobs still queued stay pending and are picked up again once they look stale
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+def is_stale(attempt: models.QuizAttempt) -> bool:
+    updated_at = attempt.guidance_updated_at
+    return updated_at is None or datetime.now(timezone.utc) - updated_at > timedelta(
+        seconds=GUIDANCE_PENDING_TIMEOUT_SECONDS
+    )
+
+
+async def requeue(db: AsyncSession, attempt: models.QuizAttempt) -> None:
+    """Mark an attempt pending and queue it; used for attempts without guidance and lost jobs."""
+    attempt_id = attempt.id
+    await _set_status(db, [attempt_id], PENDING)
+    enqueue(attempt_id)
+
+
+async def warm(db: AsyncSession, limit: int, since: Optional[datetime] = None) -> int:
+    """
+    Queue guidance for up to `limit` attempts that don't have it yet, newest first.
+    Bounded by the free space in this process's queue. Returns the number queued.
+    """
+    limit = min(limit, _queue.maxsize - _queue.qsize())
+    if limit <= 0:
+        return 0
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=GUIDANCE_PENDING_TIMEOUT_SECONDS)
+    query = (
+        select(Attempt.id)
+        .where(or_(
+            Attempt.guidance_status.is_(None),
+            Attempt.guidance_status == FAILED,
+            (Attempt.guidance_status == PENDING) & (Attempt.guidance_updated_at < stale_before),
+        ))
+        .order_by(Attempt.completed_at.desc(), Attempt.id.desc())
+        .limit(limit)
+    )
+    if since is not None:
+        query = query.where(Attempt.completed_at >= since)
+    attempt_ids = list((await db.execute(query)).scalars())
+    if attempt_ids:
+        await _set_status(db, attempt_ids, PENDING)
+        for attempt_id in attempt_ids:
+            enqueue(attempt_id)
+    return len(attempt_ids)
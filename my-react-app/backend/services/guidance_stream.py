@@ -0,0 +1,68 @@
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import SessionLocal
+from ..fast_json import dumps
+from . import guidance_cache, guidance_jobs
+
+logger = logging.getLogger(__name__)
+
+
+def _event(name: str, data: Any) -> bytes:
+    return b"event: " + name.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def _mark_ready(attempt_id: UUID, guidance: Dict[str, Any]) -> None:
+    try:
+        async with SessionLocal() as db:
+            await guidance_jobs.mark_ready(db, attempt_id, guidance)
+    except Exception as e:
+        logger.error(f"Could not save streamed guidance for attempt {attempt_id}: {e}")
+
+
+async def guidance_events(attempt_id: UUID, inputs: Dict[str, Any], guidance: Optional[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    Server-sent events for an attempt's guidance: one `section` event per top-level
+    key, then `done` (or `error`). Stored or cached guidance is replayed at once.
+    Otherwise the stream follows this process's generation for the same scores
+    (starting one if needed), so it shares the call with the background job and
+    any other readers and still relays each section as soon as it's parsed.
+    """
+    key = guidance_cache.cache_key(inputs)
+    if guidance is None:
+        # A generation may have finished since open_stream checked
+        guidance = guidance_cache.memory.get(key)
+
+    if guidance is not None:
+        for name, value in guidance.items():
+            yield _event("section", {"key": name, "value": value})
+        yield _event("done", {})
+        return
+
+    generated: Dict[str, Any] = {}
+    try:
+        async for name, value in guidance_cache.generation(key, inputs).follow():
+            generated[name] = value
+            yield _event("section", {"key": name, "value": value})
+    except Exception as e:
+        logger.warning(f"Streaming guidance for attempt {attempt_id} failed: {e}")
+        yield _event("error", {"detail": "AI guidance unavailable"})
+        return
+    await _mark_ready(attempt_id, generated)
+    yield _event("done", {})
+
+
+async def open_stream(db: AsyncSession, attempt) -> AsyncIterator[bytes]:
+    """Resolve stored or cached guidance up front, then hand back the event stream."""
+    attempt_id = attempt.id
+    inputs = guidance_cache.prompt_inputs(attempt)
+    if attempt.guidance_status == guidance_jobs.READY:
+        guidance = attempt.guidance
+    else:
+        guidance = await guidance_cache.lookup(db, guidance_cache.cache_key(inputs))
+    # The stream can run for the whole generation; don't hold the request's connection meanwhile
+    await db.rollback()
+    return guidance_events(attempt_id, inputs, guidance)
@@ -0,0 +1,97 @@
+import random
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from . import answer_key
+
+QUIZ_LENGTH = 30
+
+Stratum = Tuple[models.QuizDomain, models.DifficultyLevel]
+# A request's (domain, difficulty) filter; None matches any
+Filter = Tuple[Optional[models.QuizDomain], Optional[models.DifficultyLevel]]
+
+# Question id pools derived from the answer key, rebuilt whenever the index is replaced.
+# For every filter: the matching non-empty strata, and all their ids flattened into one list.
+_pools_source = None
+_pools_size = 0
+_strata: Dict[Filter, List[List[UUID]]] = {}
+_candidates: Dict[Filter, List[UUID]] = {}
+
+
+def _refresh_pools(index: Dict[UUID, answer_key.AnswerKeyEntry]) -> None:
+    global _pools_source, _pools_size, _strata, _candidates
+    if index is _pools_source and _pools_size == len(index):
+        return
+
+    pools: Dict[Stratum, List[UUID]] = defaultdict(list)
+    for question_id, entry in index.items():
+        pools[(entry.domain, entry.difficulty)].append(question_id)
+
+    strata: Dict[Filter, List[List[UUID]]] = {}
+    candidates: Dict[Filter, List[UUID]] = {}
+    for domain in (None, *models.QuizDomain):
+        for difficulty in (None, *models.DifficultyLevel):
+            matching = [
+                ids for (stratum_domain, stratum_difficulty), ids in pools.items()
+                if (domain is None or stratum_domain == domain)
+                and (difficulty is None or stratum_difficulty == difficulty)
+            ]
+            strata[(domain, difficulty)] = matching
+            candidates[(domain, difficulty)] = [question_id for ids in matching for question_id in ids]
+
+    _strata, _candidates = strata, candidates
+    _pools_source, _pools_size = index, len(index)
+
+
+def _allocate(sizes: Sequence[int], count: int) -> List[int]:
+    """Split `count` as evenly as possible across strata without exceeding any stratum's size."""
+    allocation = [0] * len(sizes)
+    remaining = min(count, sum(sizes))
+    while remaining:
+        open_strata = [i for i, size in enumerate(sizes) if allocation[i] < size]
+        share, extra = divmod(remaining, len(open_strata))
+        random.shuffle(open_strata)
+        for position, i in enumerate(open_strata):
+            take = min(share + (1 if position < extra else 0), sizes[i] - allocation[i])
+            allocation[i] += take
+            remaining -= take
+    return allocation
+
+
+async def sample_question_ids(
+    count: int = QUIZ_LENGTH,
+    domain: Optional[models.QuizDomain] = None,
+    difficulty: Optional[models.DifficultyLevel] = None,
+    stratify: bool = False,
+) -> List[UUID]:
+    """
+    Draw question ids from the cached pool without touching the questions table.
+    With `stratify`, the draw is spread evenly across (domain, difficulty) strata.
+    """
+    _refresh_pools(await answer_key.get_answer_key())
+    strata, candidates = _strata[(domain, difficulty)], _candidates[(domain, difficulty)]
+
+    if not stratify:
+        return random.sample(candidates, min(count, len(candidates)))
+
+    sampled: List[UUID] = []
+    for ids, take in zip(strata, _allocate([len(ids) for ids in strata], count)):
+        sampled.extend(random.sample(ids, take))
+    random.shuffle(sampled)
+    return sampled
+
+
+async def sample_questions(db: AsyncSession, **kwargs) -> List[models.Question]:
+    """Sample question ids and fetch only those rows by primary key, in sampled order."""
+    question_ids = await sample_question_ids(**kwargs)
+    if not question_ids:
+        return []
+
+    result = await db.execute(select(models.Question).where(models.Question.id.in_(question_ids)))
+    questions = {question.id: question for question in result.scalars().all()}
+    return [questions[question_id] for question_id in question_ids if question_id in questions]
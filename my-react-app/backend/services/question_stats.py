@@ -0,0 +1,209 @@
+import asyncio
+import enum
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import Float, cast, func, nulls_last, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Buffered counts are written at least this often, or sooner once this many questions are pending
+QUESTION_STATS_FLUSH_SECONDS = float(os.getenv("QUESTION_STATS_FLUSH_SECONDS", "10"))
+QUESTION_STATS_FLUSH_THRESHOLD = int(os.getenv("QUESTION_STATS_FLUSH_THRESHOLD", "2000"))
+# Rows per upsert statement, well under asyncpg's bind parameter limit
+FLUSH_CHUNK_SIZE = 1000
+
+OPTION_COUNT = 4
+COUNTER_COLUMNS = ["times_served", "times_answered", "times_correct"] + [
+    f"option_{option}_count" for option in range(1, OPTION_COUNT + 1)
+]
+_SERVED, _ANSWERED, _CORRECT, _FIRST_OPTION = 0, 1, 2, 3
+
+Stat = models.QuestionStat
+
+
+class StatsBuffer:
+    """Per-process counter deltas waiting to be added to question_stats."""
+
+    def __init__(self):
+        self._pending: Dict[UUID, List[int]] = {}
+        self.full = asyncio.Event()
+
+    def _counts(self, question_id: UUID) -> List[int]:
+        counts = self._pending.get(question_id)
+        if counts is None:
+            counts = self._pending[question_id] = [0] * len(COUNTER_COLUMNS)
+            if len(self._pending) >= QUESTION_STATS_FLUSH_THRESHOLD:
+                self.full.set()
+        return counts
+
+    def record_served(self, question_ids: Iterable[UUID]) -> None:
+        for question_id in question_ids:
+            self._counts(question_id)[_SERVED] += 1
+
+    def record_answer(self, question_id: UUID, selected_answer: int, is_correct: bool) -> None:
+        counts = self._counts(question_id)
+        counts[_ANSWERED] += 1
+        if is_correct:
+            counts[_CORRECT] += 1
+        if 1 <= selected_answer <= OPTION_COUNT:
+            counts[_FIRST_OPTION + selected_answer - 1] += 1
+
+    def take(self) -> Dict[UUID, List[int]]:
+        pending, self._pending = self._pending, {}
+        self.full.clear()
+        return pending
+
+    def restore(self, pending: Dict[UUID, List[int]]) -> None:
+        # Put back counts from a failed flush so they go out with the next one
+        for question_id, deltas in pending.items():
+            counts = self._counts(question_id)
+            for index, delta in enumerate(deltas):
+                counts[index] += delta
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+buffer = StatsBuffer()
+_flusher: Optional[asyncio.Task] = None
+_stopping = False
+
+
+async def flush() -> int:
+    """Add the buffered deltas to question_stats in one transaction. Returns questions written."""
+    pending = buffer.take()
+    if not pending:
+        return 0
+    # Sorted so concurrent flushes from several processes lock rows in the same order
+    rows = [
+        {"question_id": question_id, **dict(zip(COUNTER_COLUMNS, counts))}
+        for question_id, counts in sorted(pending.items())
+    ]
+    try:
+        async with SessionLocal() as session:
+            for start in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                statement = pg_insert(Stat).values(rows[start:start + FLUSH_CHUNK_SIZE])
+                await session.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[Stat.question_id],
+                        set_={
+                            **{column: getattr(Stat, column) + statement.excluded[column] for column in COUNTER_COLUMNS},
+                            "updated_at": func.now(),
+                        },
+                    )
+                )
+            await session.commit()
+    except Exception:
+        buffer.restore(pending)
+        raise
+    return len(rows)
+
+
+async def run_flusher() -> None:
+    """Background task: flush on the interval, or early when the buffer fills up, until stop()."""
+    while not _stopping:
+        try:
+            await asyncio.wait_for(buffer.full.wait(), timeout=QUESTION_STATS_FLUSH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await flush()
+        except Exception as e:
+            logger.error(f"Question stats flush failed, will retry: {e}")
+
+
+def start() -> None:
+    global _flusher, _stopping
+    _stopping = False
+    _flusher = asyncio.create_task(run_flusher())
+
+
+async def stop() -> None:
+    """
+    Let the flusher finish its current flush instead of cancelling it: a cancelled
+    flush has already taken the buffer and would drop those counts. Then flush
+    whatever was recorded meanwhile.
+    """
+    global _flusher, _stopping
+    if _flusher is not None:
+        _stopping = True
+        buffer.full.set()  # wake the flusher now rather than after the interval
+        await _flusher
+        _flusher = None
+    try:
+        await flush()
+    except Exception as e:
+        logger.error(f"Final question stats flush failed: {e}")
+
+
+class StatsSort(str, enum.Enum):
+    accuracy = "accuracy"
+    times_served = "times_served"
+    times_answered = "times_answered"
+    times_correct = "times_correct"
+
+
+async def question_stats(
+    db: AsyncSession,
+    sort: StatsSort = StatsSort.accuracy,
+    descending: bool = False,
+    domain: Optional[models.QuizDomain] = None,
+    difficulty: Optional[models.DifficultyLevel] = None,
+    min_answered: int = 0,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """Questions with their counters; unanswered questions have a null accuracy and sort last."""
+    counters = {column: func.coalesce(getattr(Stat, column), 0).label(column) for column in COUNTER_COLUMNS}
+    accuracy = (
+        cast(counters["times_correct"], Float) / func.nullif(counters["times_answered"], 0)
+    ).label("accuracy")
+
+    query = (
+        select(
+            models.Question.id,
+            models.Question.question_text,
+            models.Question.domain,
+            models.Question.difficulty,
+            models.Question.correct_answer,
+            *counters.values(),
+            accuracy,
+        )
+        .select_from(models.Question)
+        .outerjoin(Stat, Stat.question_id == models.Question.id)
+    )
+    if domain is not None:
+        query = query.where(models.Question.domain == domain)
+    if difficulty is not None:
+        query = query.where(models.Question.difficulty == difficulty)
+    if min_answered:
+        query = query.where(counters["times_answered"] >= min_answered)
+
+    sort_column = accuracy if sort == StatsSort.accuracy else counters[sort.value]
+    query = query.order_by(
+        nulls_last(sort_column.desc() if descending else sort_column.asc()), models.Question.id
+    ).limit(limit)
+
+    result = await db.execute(query)
+    return [
+        {
+            "question_id": row.id,
+            "question_text": row.question_text,
+            "domain": row.domain,
+            "difficulty": row.difficulty,
+            "correct_answer": row.correct_answer,
+            "times_served": row.times_served,
+            "times_answered": row.times_answered,
+            "times_correct": row.times_correct,
+            "accuracy": round(row.accuracy, 4) if row.accuracy is not None else None,
+            "option_counts": [getattr(row, f"option_{option}_count") for option in range(1, OPTION_COUNT + 1)],
+        }
+        for row in result
+    ]
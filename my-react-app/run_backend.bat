@@ -1,3 +1,4 @@
 @echo off
+REM Apply pending schema migrations first (once per schema change): python -m backend.init_db
 python -m uvicorn backend.main:app --reload
 pause
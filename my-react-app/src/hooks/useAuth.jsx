@@ -24,6 +24,7 @@ export const AuthProvider = ({ children }) => {
       } catch (error) {
         console.error("Auth check failed:", error);
         localStorage.removeItem("token");
+        localStorage.removeItem("refresh_token");
       } finally {
         setLoading(false);
       }
@@ -32,6 +33,21 @@ export const AuthProvider = ({ children }) => {
     checkAuth();
   }, []);
 
+  const storeTokens = ({ access_token, refresh_token }) => {
+    localStorage.setItem("token", access_token);
+    if (refresh_token) {
+      localStorage.setItem("refresh_token", refresh_token);
+    }
+  };
+
+  const loadCurrentUser = async () => {
+    const userResponse = await api.get("/auth/me");
+    setUser(userResponse.data);
+    // Set admin status
+    setIsAdmin(userResponse.data.is_admin || false);
+    return userResponse.data;
+  };
+
   const login = async (email, password) => {
     const formData = new FormData();
     formData.append("username", email);
@@ -41,25 +57,20 @@ export const AuthProvider = ({ children }) => {
       headers: { "Content-Type": "multipart/form-data" }
     });
 
-    const { access_token } = response.data;
-    localStorage.setItem("token", access_token);
-
-    // Fetch user details
-    const userResponse = await api.get("/auth/me");
-    setUser(userResponse.data);
-    // Set admin status
-    setIsAdmin(userResponse.data.is_admin || false);
-    return userResponse.data;
+    storeTokens(response.data);
+    return loadCurrentUser();
   };
 
   const register = async (email, password, fullName) => {
-    await api.post("/auth/register", { email, password, full_name: fullName });
-    // Auto login after register for better UX
-    return login(email, password);
+    const response = await api.post("/auth/register", { email, password, full_name: fullName });
+    // Registration already returns tokens, so sign in without a second password check
+    storeTokens(response.data);
+    return loadCurrentUser();
   };
 
   const signOut = () => {
     localStorage.removeItem("token");
+    localStorage.removeItem("refresh_token");
     setUser(null);
     setIsAdmin(false);
   };
@@ -24,17 +24,93 @@ api.interceptors.request.use(
     }
 );
 
+// Exchange the stored refresh token for a new token pair (no password needed).
+// Concurrent 401s share one refresh request, since each refresh token works only once.
+let refreshPromise = null;
+const SKIP_REFRESH_URLS = ['/auth/login', '/auth/register', '/auth/refresh'];
+
+const refreshTokens = () => {
+    if (!refreshPromise) {
+        const refreshToken = localStorage.getItem('refresh_token');
+        refreshPromise = (refreshToken
+            ? axios.post(`${API_URL}/auth/refresh`, { refresh_token: refreshToken }, { withCredentials: true })
+            : Promise.reject(new Error('No refresh token'))
+        )
+            .then((response) => {
+                localStorage.setItem('token', response.data.access_token);
+                localStorage.setItem('refresh_token', response.data.refresh_token);
+                return response.data.access_token;
+            })
+            .finally(() => {
+                refreshPromise = null;
+            });
+    }
+    return refreshPromise;
+};
+
 // Add a response interceptor to handle 401 errors (unauthorized)
 api.interceptors.response.use(
     (response) => response,
-    (error) => {
+    async (error) => {
+        const originalRequest = error.config;
         if (error.response && error.response.status === 401) {
+            // Access token expired: try a silent refresh once before sending the user to sign in
+            if (originalRequest && !originalRequest._retry && !SKIP_REFRESH_URLS.includes(originalRequest.url)) {
+                originalRequest._retry = true;
+                try {
+                    const accessToken = await refreshTokens();
+                    originalRequest.headers.Authorization = `Bearer ${accessToken}`;
+                    return api(originalRequest);
+                } catch (refreshError) {
+                    // Fall through to sign-in
+                }
+            }
             // Token expired or invalid
             localStorage.removeItem('token');
+            localStorage.removeItem('refresh_token');
             window.location.href = '/auth';
         }
         return Promise.reject(error);
     }
 );
 
+// Fetch every page of a keyset-paginated listing by following the X-Next-Cursor header.
+export const getAllPages = async (url, pageSize = 500) => {
+    const items = [];
+    let cursor;
+    do {
+        const response = await api.get(url, { params: { limit: pageSize, cursor } });
+        items.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return items;
+};
+
+// Read a server-sent event stream from the API, calling onEvent(name, data) for each event.
+// Uses fetch rather than EventSource so the Authorization header can be sent.
+export const streamEvents = async (url, onEvent) => {
+    const response = await fetch(`${API_URL}${url}`, {
+        headers: { Authorization: `Bearer ${localStorage.getItem('token')}`, Accept: 'text/event-stream' },
+        credentials: 'include',
+    });
+    if (!response.ok || !response.body) {
+        throw new Error(`Stream request failed with status ${response.status}`);
+    }
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) return;
+        buffer += value;
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const name = message.match(/^event: (.*)$/m)?.[1] ?? 'message';
+            const data = message.match(/^data: (.*)$/m)?.[1];
+            onEvent(name, data === undefined ? null : JSON.parse(data));
+        }
+    }
+};
+
 export default api;
@@ -29,18 +29,19 @@ import {
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { useNavigate } from "react-router-dom";
 import { useAuth } from "@/hooks/useAuth";
-import api from "@/lib/api";
+import api, { getAllPages } from "@/lib/api";
 
 const fetchDashboardData = async () => {
-  const [profileRes, attemptsRes, progressRes] = await Promise.all([
+  // Attempts are paginated; totals and charts need all of them
+  const [profileRes, attempts, progressRes] = await Promise.all([
     api.get('/auth/me'),
-    api.get('/quiz/attempts'),
+    getAllPages('/quiz/attempts'),
     api.get('/progress/')
   ]);
 
   return {
     profile: profileRes.data,
-    attempts: attemptsRes.data,
+    attempts,
     progress: progressRes.data
   };
 };
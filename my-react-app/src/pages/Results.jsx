@@ -32,7 +32,7 @@ import {
   CartesianGrid,
   Tooltip,
 } from "recharts";
-import api from "@/lib/api";
+import api, { streamEvents } from "@/lib/api";
 import { useAuth } from "@/hooks/useAuth";
 import { useToast } from "@/hooks/use-toast";
 
@@ -98,6 +98,8 @@ const salaryData = [
 ];
 
 const COLORS = ['#0088FE', '#00C49F', '#FFBB28', '#FF8042', '#8884d8'];
+const GUIDANCE_POLL_INTERVAL_MS = 2000;
+const GUIDANCE_MAX_POLLS = 30;
 
 export default function Results() {
   const location = useLocation();
@@ -155,11 +157,37 @@ export default function Results() {
           console.error("Failed to fetch content:", contentError);
         }
 
-        // Fetch AI guidance
+        // The page can render with the static domain info while AI guidance arrives
+        setLoading(false);
         setAiLoading(true);
         try {
-          const aiResponse = await api.get(`/quiz/attempts/${attemptId}/ai-guidance`);
-          setAiGuidance(aiResponse.data);
+          // Stream the guidance so each section shows up as soon as the model finishes it
+          let streamed = false;
+          try {
+            await streamEvents(`/quiz/attempts/${attemptId}/ai-guidance/stream`, (event, payload) => {
+              if (event === "section") {
+                setAiGuidance((previous) => ({ ...(previous || {}), [payload.key]: payload.value }));
+              } else if (event === "done") {
+                streamed = true;
+              }
+            });
+          } catch (streamError) {
+            console.error("AI guidance stream unavailable:", streamError);
+          }
+
+          if (!streamed) {
+            // Fall back to polling; the guidance is also generated in the background
+            // after submission, and the API reports it as pending (202) until then
+            setAiGuidance(null);
+            for (let poll = 0; poll < GUIDANCE_MAX_POLLS; poll++) {
+              const aiResponse = await api.get(`/quiz/attempts/${attemptId}/ai-guidance`);
+              if (aiResponse.status !== 202) {
+                setAiGuidance(aiResponse.data);
+                break;
+              }
+              await new Promise((resolve) => setTimeout(resolve, GUIDANCE_POLL_INTERVAL_MS));
+            }
+          }
         } catch (aiError) {
           console.error("Failed to fetch AI guidance:", aiError);
           // Continue without AI guidance
@@ -198,7 +226,8 @@ export default function Results() {
 
   const domain = attempt.recommended_domain;
   // Use AI guidance if available, otherwise fall back to static data
-  const domainData = aiGuidance || domainInfo[domain] || domainInfo.programmer;
+  // AI sections (possibly still streaming in) override the static domain info as they arrive
+  const domainData = { ...(domainInfo[domain] || domainInfo.programmer), ...(aiGuidance || {}) };
   const DomainIcon = domainInfo[domain]?.icon || domainInfo.programmer.icon;
 
   // Calculate radar chart data from scores